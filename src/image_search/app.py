@@ -28,7 +28,7 @@ def get_data_dir() -> Path:
 def main():
     from PyQt6.QtWidgets import QApplication
     from PyQt6.QtCore import Qt
-    from PyQt6.QtGui import QFont
+    from PyQt6.QtGui import QFont, QPixmapCache
     
     # High DPI support
     QApplication.setHighDpiScaleFactorRoundingPolicy(
@@ -46,6 +46,9 @@ def main():
     font.setPointSize(13)
     app.setFont(font)
     
+    # Decoded grid thumbnails are shared through QPixmapCache (~110 KB each)
+    QPixmapCache.setCacheLimit(200 * 1024)  # KB
+    
     # Import and create main window
     from image_search.gui import MainWindow
     
@@ -15,6 +15,7 @@ Commands:
 import argparse
 import sys
 import os
+from itertools import islice
 from pathlib import Path
 from typing import Optional
 
@@ -32,23 +33,58 @@ def get_data_dir() -> Path:
     return cwd
 
 
+IMAGE_EXTS = {"jpg", "jpeg", "png", "webp", "heic"}
+
+
+def positive_int(value: str) -> int:
+    """argparse type for counts that must be at least 1"""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid int value: {value!r}")
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {number}")
+    return number
+
+
+def iter_images(root: Path):
+    """Yield image paths under root in one os.scandir walk (no per-entry stat)"""
+    stack = [str(root)]
+    while stack:
+        try:
+            it = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.rpartition(".")[2].lower() in IMAGE_EXTS and entry.is_file():
+                    yield entry.path
+
+
 def cmd_index(args):
     """Index images from directory"""
     from image_search.core import SearchEngine
     
-    engine = SearchEngine(data_dir=args.data_dir)
+    engine = SearchEngine(
+        data_dir=args.data_dir,
+        profile_memory=args.profile_memory,
+        url=args.qdrant_url,
+        skip_textless=args.skip_textless,
+        max_workers=args.workers,
+    )
     
     path = Path(args.path)
     if not path.exists():
         print(f"Error: Path does not exist: {path}")
         sys.exit(1)
     
-    images = []
     if path.is_file():
         images = [str(path)]
     else:
-        for ext in ('*.jpg', '*.jpeg', '*.png', '*.webp', '*.heic'):
-            images.extend(str(p) for p in path.rglob(ext))
+        # With --limit, stop walking once enough images are found
+        images = list(islice(iter_images(path), args.limit or None))
     
     if not images:
         print(f"No images found in {path}")
@@ -57,16 +93,23 @@ def cmd_index(args):
     print(f"Found {len(images)} images")
     
     indexed = 0
-    for i, img_path in enumerate(images[:args.limit] if args.limit else images):
-        print(f"[{i+1}/{len(images)}] {Path(img_path).name}...", end=" ", flush=True)
+    for start in range(0, len(images), args.batch_size):
+        batch = images[start:start + args.batch_size]
+        error = ""
         try:
-            if engine.add_image(img_path):
+            statuses = engine.add_images_batch(batch)
+        except Exception as e:
+            statuses, error = [None] * len(batch), str(e)
+
+        for i, (img_path, status) in enumerate(zip(batch, statuses), start + 1):
+            print(f"[{i}/{len(images)}] {Path(img_path).name}...", end=" ")
+            if status:
                 indexed += 1
                 print("✓")
-            else:
+            elif status is False:
                 print("(exists)")
-        except Exception as e:
-            print(f"✗ {e}")
+            else:
+                print(f"✗ {error}".rstrip())
     
     print(f"\nIndexed {indexed} new images")
     engine.close()
@@ -76,9 +119,9 @@ def cmd_search(args):
     """Search for images"""
     from image_search.core import SearchEngine
     
-    engine = SearchEngine(data_dir=args.data_dir)
+    engine = SearchEngine(data_dir=args.data_dir, url=args.qdrant_url)
     
-    results = engine.search(args.query, limit=args.limit)
+    results = engine.search(args.query, limit=args.limit, rescore=args.rescore)
     
     if not results:
         print("No results found")
@@ -147,27 +190,42 @@ def cmd_faces(args):
         print(f"✓ Removed {args.name}")
 
 
+def dir_size(root: Path) -> int:
+    """Total size of files under root, using the stat cached on each DirEntry"""
+    size = 0
+    stack = [str(root)]
+    while stack:
+        with os.scandir(stack.pop()) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    size += entry.stat(follow_symlinks=False).st_size
+    return size
+
+
 def cmd_stats(args):
     """Show database statistics"""
     from image_search.core import SearchEngine
     
-    engine = SearchEngine(data_dir=args.data_dir)
+    engine = SearchEngine(data_dir=args.data_dir, url=args.qdrant_url)
     
     print("\n📊 Image Search Statistics\n")
     
-    # Get all images
-    images = engine.get_all_images(limit=10000)
-    print(f"Total indexed images: {len(images)}")
-    
-    # Face stats
+    # Stream all images page by page, counting as we go
+    total = 0
     faces_count = {}
     ocr_count = 0
-    for path, meta in images:
+    for path, meta in engine.iter_images():
+        if not path or not os.path.exists(path):
+            continue
+        total += 1
         for face in meta.get("faces", []):
             faces_count[face] = faces_count.get(face, 0) + 1
         if meta.get("ocr_text"):
             ocr_count += 1
     
+    print(f"Total indexed images: {total}")
     print(f"Images with text (OCR): {ocr_count}")
     
     if faces_count:
@@ -183,7 +241,7 @@ def cmd_stats(args):
     # Database size
     db_path = Path(args.data_dir) / "qdrant_db"
     if db_path.exists():
-        size = sum(f.stat().st_size for f in db_path.rglob("*") if f.is_file())
+        size = dir_size(db_path)
         print(f"Database size: {size / 1024 / 1024:.1f} MB")
     
     engine.close()
@@ -293,6 +351,12 @@ Examples:
         default=get_data_dir(),
         help="Data directory for index and faces (default: current dir)"
     )
+    parser.add_argument(
+        "--qdrant-url",
+        type=str,
+        default=None,
+        help="Use a Qdrant server (over gRPC) instead of the embedded DB"
+    )
     
     subparsers = parser.add_subparsers(dest="command", help="Available commands")
     
@@ -300,6 +364,20 @@ Examples:
     index_parser = subparsers.add_parser("index", help="Index images from a directory")
     index_parser.add_argument("path", type=str, help="Path to image or directory")
     index_parser.add_argument("--limit", "-n", type=int, help="Max images to index")
+    index_parser.add_argument(
+        "--batch-size", "-b", type=positive_int, default=16, help="Images per CLIP batch (default: 16)"
+    )
+    index_parser.add_argument(
+        "--profile-memory", action="store_true", help="Record RSS change per pipeline stage"
+    )
+    index_parser.add_argument(
+        "--workers", "-w", type=positive_int, default=3,
+        help="Threads for the OCR/face/CLIP stages (default: 3; fewer on low-core machines)"
+    )
+    index_parser.add_argument(
+        "--skip-textless", action="store_true",
+        help="Skip OCR on images a quick check finds no text in (faster, may miss some text)"
+    )
     index_parser.set_defaults(func=cmd_index)
     
     # Search command
@@ -307,6 +385,10 @@ Examples:
     search_parser.add_argument("query", type=str, help="Search query")
     search_parser.add_argument("--limit", "-n", type=int, default=10, help="Max results")
     search_parser.add_argument("--show-ocr", action="store_true", help="Show OCR text")
+    search_parser.add_argument(
+        "--rescore", action="store_true",
+        help="Re-rank with full-precision vectors (only has an effect with --qdrant-url)"
+    )
     search_parser.set_defaults(func=cmd_search)
     
     # Faces command
@@ -1,18 +1,40 @@
 """
 Core ML components for image search
 """
-from .embedder import ImageEmbedder, MLXClipWrapper
-from .search_engine import SearchEngine
-from .face_recognition import FaceIdentifier
-from .ocr import OCR
-from .monitor import PerformanceMonitor
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .embedder import ImageEmbedder, MLXClipWrapper
+    from .face_recognition import FaceIdentifier
+    from .monitor import PerformanceMonitor
+    from .ocr import OCR
+    from .search_engine import SearchEngine
+
+# Submodules pull in MLX, DeepFace and Qdrant, so they are only imported
+# when one of these names is first accessed (PEP 562)
+_EXPORTS = {
+    "ImageEmbedder": ".embedder",
+    "MLXClipWrapper": ".embedder",
+    "SearchEngine": ".search_engine",
+    "FaceIdentifier": ".face_recognition",
+    "OCR": ".ocr",
+    "PerformanceMonitor": ".monitor",
+}
 
 __all__ = [
-    "ImageEmbedder",
-    "MLXClipWrapper", 
-    "SearchEngine",
-    "FaceIdentifier",
-    "OCR",
-    "PerformanceMonitor",
+    "ImageEmbedder", "MLXClipWrapper", "SearchEngine",
+    "FaceIdentifier", "OCR", "PerformanceMonitor",
 ]
 
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
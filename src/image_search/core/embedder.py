@@ -3,9 +3,21 @@ Image embedding using MLX CLIP
 """
 from __future__ import annotations
 
+import hashlib
+import heapq
+import json
 import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+from PIL import Image
+
+from .imaging import load_image
 from .monitor import PerformanceMonitor
 from .ocr import OCR
 from .face_recognition import FaceIdentifier
@@ -13,11 +25,17 @@ from .face_recognition import FaceIdentifier
 
 class MLXClipWrapper:
     """Wrapper for mlx_clip that handles model loading and encoding."""
+
+    # Image batches are padded up to one of these sizes so the compiled graph
+    # is only ever traced for a handful of shapes
+    BATCH_BUCKETS = (1, 8, 16, 32)
     
     def __init__(self, hf_repo: str = "openai/clip-vit-base-patch32"):
         from mlx_clip import CLIPModel, CLIPImageProcessor, CLIPTokenizer
         from mlx_clip.convert import convert_weights
         import mlx.core as mx
+
+        self.hf_repo = hf_repo
         
         # Local path for converted weights
         mlx_path = Path.home() / ".cache" / "mlx_clip" / hf_repo.replace("/", "_")
@@ -32,27 +50,70 @@ class MLXClipWrapper:
         self.processor = CLIPImageProcessor.from_pretrained(str(mlx_path))
         self.tokenizer = CLIPTokenizer.from_pretrained(str(mlx_path))
         self.mx = mx
+
+        # Graph-compiled forward passes, traced once per input shape
+        compile_fn = getattr(mx, "compile", None)
+        if compile_fn is not None:
+            self._image_features = compile_fn(self.model.get_image_features)
+            self._text_features = compile_fn(self.model.get_text_features)
+        else:
+            self._image_features = self.model.get_image_features
+            self._text_features = self.model.get_text_features
+
+    def _batched_image_features(self, pixel_values):
+        """Image features with the batch zero-padded up to the next bucket size"""
+        n = pixel_values.shape[0]
+        size = next((b for b in self.BATCH_BUCKETS if b >= n), n)
+        if size > n:
+            pad = self.mx.zeros((size - n, *pixel_values.shape[1:]), dtype=pixel_values.dtype)
+            pixel_values = self.mx.concatenate([pixel_values, pad])
+        return self._image_features(pixel_values)[:n]
         
-    def encode_image(self, img_path: str) -> list[float]:
-        """Generate CLIP embedding for an image"""
-        from PIL import Image
-        
-        img = Image.open(img_path).convert("RGB")
+    def encode_image(self, img_path: str | Image.Image) -> list[float]:
+        """Generate CLIP embedding for an image (a path or decoded PIL image)"""
+        img = load_image(img_path)
         pixel_values = self.processor([img])
-        features = self.model.get_image_features(pixel_values)
+        features = self._image_features(pixel_values)
         self.mx.eval(features)
         
         return features.tolist()[0]
+
+    def encode_images(self, img_paths: list[str | Image.Image]) -> np.ndarray:
+        """Generate CLIP embeddings for several images (paths or decoded PIL images) in one forward pass"""
+        # PIL releases the GIL while decoding, so decode the batch in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(img_paths)) or 1) as ex:
+            imgs = list(ex.map(load_image, img_paths))
+
+        pixel_values = self.processor(imgs)
+        features = self._batched_image_features(pixel_values)
+        self.mx.eval(features)
+
+        # One contiguous (N, D) float32 array instead of N lists of Python floats.
+        # Same precision as encode_image; fp16 rounding happens only when
+        # vectors are cached or stored, whichever path computed them
+        return np.array(features, dtype=np.float32)
     
     def encode_text(self, text: str) -> list[float]:
         """Generate CLIP embedding for text query"""
         input_ids = self.tokenizer(text)[None]
-        features = self.model.get_text_features(input_ids)
+        features = self._text_features(input_ids)
         self.mx.eval(features)
         
         return features.tolist()[0]
 
 
+def _run_stage(monitor: PerformanceMonitor, name: str, fn, img):
+    """
+    Run an OCR/face stage with its errors raised. Returns (result, ok); a failed
+    stage gives (None, False) so its empty stand-in is never cached as the real result.
+    """
+    try:
+        return monitor.call(name, fn, img, raise_errors=True), True
+    except Exception as e:
+        print(f"[{name} Error] {e}")
+        return None, False
+
+
 class ImageEmbedder:
     """
     Complete image processing pipeline:
@@ -60,15 +121,126 @@ class ImageEmbedder:
     - OCR for text extraction
     - Face detection and recognition
     """
+
+    QUERY_CACHE_SIZE = 1024  # text query embeddings kept in memory
+    EMBED_CACHE_MAX_ENTRIES = 100_000  # per-image results on disk (~1.5 KB each)
     
-    def __init__(self, data_dir: str | Path | None = None):
+    def __init__(
+        self,
+        data_dir: str | Path | None = None,
+        profile_memory: bool = False,
+        max_workers: int = 3,
+        skip_textless: bool = False,
+    ):
         self.data_dir = Path(data_dir) if data_dir else Path.cwd()
+        self.profile_memory = profile_memory  # RSS deltas per stage; costs syscalls per image
 
         print("--- Loading MLX CLIP (Apple Silicon Optimized) ---")
         self.clip = MLXClipWrapper()
-        self.ocr = OCR()
+        self.ocr = OCR(skip_textless=skip_textless)
         self.face_identifier = FaceIdentifier(data_dir=self.data_dir)
 
+        # One worker per pipeline stage (OCR, faces, CLIP) by default; fewer on
+        # low-core machines makes the stages take turns instead of contending
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="embedder"
+        )
+
+        # Run a dummy pass through the models in the background while the caller
+        # gets on with startup; the first real call waits for it to finish
+        self._warmup = self._executor.submit(self._warm_up)
+
+        # Per-image results keyed by file content: <key>.npy (vector) + <key>.json (metadata)
+        self._cache_dir = self.data_dir / ".embed_cache"
+        self._executor.submit(self._trim_cache)
+
+        # Query embeddings: in-process LRU in front of an SQLite table that survives restarts
+        self._query_lru: OrderedDict[str, np.ndarray] = OrderedDict()  # read-only float32 arrays
+        self._query_conn: sqlite3.Connection | None = None
+        self._query_lock = threading.Lock()
+
+    def _warm_up(self):
+        """Compile CLIP's Metal kernels and load ArcFace ahead of the first image"""
+        try:
+            self.clip.encode_image(Image.new("RGB", (224, 224)))
+            self.clip.encode_text("a photo")
+        except Exception as e:
+            print(f"[CLIP Warmup Error] {e}")
+        self.face_identifier.warm_up()
+
+    def _cache_key(self, img_path: str) -> str:
+        """Hash of the file bytes and CLIP model, so edits or a model change miss the cache"""
+        h = hashlib.blake2b(self.clip.hf_repo.encode(), digest_size=8)
+        if self.ocr.skip_textless:
+            # Gated OCR may have skipped text; keep those results apart from full runs
+            h.update(b"|skip_textless")
+        with open(img_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _load_cached(self, key: str) -> tuple[np.ndarray, dict] | None:
+        vector_path = self._cache_dir / f"{key}.npy"
+        try:
+            vector = np.load(vector_path).astype(np.float32)  # stored as fp16
+            meta = json.loads((self._cache_dir / f"{key}.json").read_text())
+            os.utime(vector_path)  # mtime is the recency _trim_cache evicts by
+        except (OSError, ValueError):
+            return None
+        return vector, meta
+
+    def _trim_cache(self):
+        """Delete the least recently used cache entries beyond EMBED_CACHE_MAX_ENTRIES"""
+        try:
+            with os.scandir(self._cache_dir) as it:
+                entries = [(e.stat().st_mtime, e.path) for e in it if e.name.endswith(".npy")]
+        except OSError:
+            return
+        excess = len(entries) - self.EMBED_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        for _, vector_path in heapq.nsmallest(excess, entries):
+            for path in (vector_path, vector_path[:-len(".npy")] + ".json"):
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+
+    def _store_cached(self, key: str, vector, meta: dict):
+        try:
+            self._cache_dir.mkdir(parents=True, exist_ok=True)
+            np.save(self._cache_dir / f"{key}.npy", np.asarray(vector, dtype=np.float16))
+            (self._cache_dir / f"{key}.json").write_text(json.dumps(meta))
+        except OSError as e:
+            print(f"[Embed Cache Error] {e}")
+
+    def _resolve(self, img_path: str) -> str:
+        img_path = str(Path(img_path))
+        if not os.path.isabs(img_path):
+            img_path = str(self.data_dir / img_path)
+        return img_path
+
+    def _from_cache(self, key: str, img_path: str, monitor: PerformanceMonitor, faces_db: str):
+        """(vector, metadata, performance_metrics) from the cache, or None on a miss"""
+        cached = self._load_cached(key)
+        if cached is None:
+            return None
+
+        vector, meta = cached
+        final_data = {"ocr_text": meta.get("ocr_text", "")}
+        # Face names depend on the known-faces DB, so only reuse them if it hasn't changed
+        if meta.get("faces_db") == faces_db:
+            final_data["faces"] = meta.get("faces", [])
+            return vector, final_data, monitor.get_summary()
+
+        faces, faces_ok = _run_stage(
+            monitor, "Face_Detection", self.face_identifier.detect_and_name, img_path
+        )
+        final_data["faces"] = [f.get("name") for f in faces or [] if f.get("name")]
+        if faces_ok:
+            self._store_cached(key, vector, {**final_data, "faces_db": faces_db})
+        return vector, final_data, monitor.get_summary()
+
     def process(self, img_path: str) -> tuple[list[float], dict, dict]:
         """
         Process an image and extract all features.
@@ -76,29 +248,168 @@ class ImageEmbedder:
         Returns:
             (vector, metadata, performance_metrics)
         """
-        monitor = PerformanceMonitor()
+        self._warmup.result()
+        monitor = PerformanceMonitor(sample_memory=self.profile_memory)
         final_data = {}
 
-        img_path = str(Path(img_path))
-        if not os.path.isabs(img_path):
-            img_path = str(self.data_dir / img_path)
+        img_path = self._resolve(img_path)
+        key = monitor.call("Cache_Lookup", self._cache_key, img_path)
+        faces_db = self.face_identifier.db_version
 
-        # 1. OCR (Vision Framework)
-        with monitor.measure("OCR"):
-            final_data["ocr_text"] = self.ocr.process(img_path)
+        cached = self._from_cache(key, img_path, monitor, faces_db)
+        if cached is not None:
+            return cached
 
-        # 2. Face Detection (DeepFace)
-        with monitor.measure("Face_Detection"):
-            faces = self.face_identifier.detect_and_name(img_path)
-            final_data["faces"] = [f.get("name") for f in faces if f.get("name")]
+        # Decode once at the OCR/face working size; CLIP resizes to 224px itself
+        img = monitor.call("Decode", load_image, img_path, self.ocr.max_dim)
 
-        # 3. CLIP Embedding (MLX GPU)
-        with monitor.measure("CLIP_Embedding"):
-            vector = self.clip.encode_image(img_path)
+        # OCR (Vision), face detection (DeepFace) and CLIP (MLX GPU) don't depend
+        # on each other and release the GIL in native code, so run them concurrently
+        f_ocr = self._executor.submit(_run_stage, monitor, "OCR", self.ocr.process, img)
+        f_faces = self._executor.submit(
+            _run_stage, monitor, "Face_Detection", self.face_identifier.detect_and_name, img
+        )
+        f_clip = self._executor.submit(
+            monitor.call, "CLIP_Embedding", self.clip.encode_image, img
+        )
 
+        ocr_text, ocr_ok = f_ocr.result()
+        faces, faces_ok = f_faces.result()
+        final_data["ocr_text"] = ocr_text or ""
+        final_data["faces"] = [f.get("name") for f in faces or [] if f.get("name")]
+        vector = f_clip.result()
+
+        # A failed stage is retried next time rather than cached as "no text" / "no faces"
+        if ocr_ok and faces_ok:
+            self._store_cached(key, vector, {**final_data, "faces_db": faces_db})
         return vector, final_data, monitor.get_summary()
 
-    def embed_query(self, query_text: str) -> list[float]:
-        """Generate embedding for a text query"""
-        return self.clip.encode_text(query_text)
+    def process_batch(self, img_paths: list[str]) -> list[tuple[np.ndarray, dict, dict] | None]:
+        """
+        Process several images, running CLIP once over the whole batch.
+
+        Returns:
+            One (vector, metadata, performance_metrics) per path, in order,
+            or None where the image couldn't be read
+        """
+        self._warmup.result()
+        paths = [self._resolve(p) for p in img_paths]
+        monitors = [PerformanceMonitor(sample_memory=self.profile_memory) for _ in paths]
+        results: list[tuple[np.ndarray, dict, dict] | None] = [None] * len(paths)
+        faces_db = self.face_identifier.db_version
+
+        misses = []  # (index, cache key)
+        for i, path in enumerate(paths):
+            try:
+                key = monitors[i].call("Cache_Lookup", self._cache_key, path)
+            except OSError as e:
+                print(f"[Embed Error] {path}: {e}")
+                continue
+            results[i] = self._from_cache(key, path, monitors[i], faces_db)
+            if results[i] is None:
+                misses.append((i, key))
+
+        if not misses:
+            return results
+
+        def _decode(i: int):
+            try:
+                return monitors[i].call("Decode", load_image, paths[i], self.ocr.max_dim)
+            except Exception as e:
+                print(f"[Embed Error] {paths[i]}: {e}")
+                return None
+
+        # PIL releases the GIL while decoding, so decode the batch in parallel
+        with ThreadPoolExecutor(max_workers=min(8, len(misses))) as ex:
+            imgs = list(ex.map(_decode, [i for i, _ in misses]))
+        batch = [(i, key, img) for (i, key), img in zip(misses, imgs) if img is not None]
+        if not batch:
+            return results
+
+        # OCR and faces run per image on the executor while CLIP takes the whole batch here
+        f_ocr = [
+            self._executor.submit(_run_stage, monitors[i], "OCR", self.ocr.process, img)
+            for i, _, img in batch
+        ]
+        f_faces = [
+            self._executor.submit(
+                _run_stage, monitors[i], "Face_Detection", self.face_identifier.detect_and_name, img
+            )
+            for i, _, img in batch
+        ]
+
+        start = time.perf_counter()
+        vectors = self.clip.encode_images([img for _, _, img in batch])
+        clip_per_image = (time.perf_counter() - start) / len(batch)
+
+        for (i, key, _), ocr_fut, faces_fut, vector in zip(batch, f_ocr, f_faces, vectors):
+            monitors[i].record("CLIP_Embedding", clip_per_image, None)
+            ocr_text, ocr_ok = ocr_fut.result()
+            faces, faces_ok = faces_fut.result()
+            final_data = {
+                "ocr_text": ocr_text or "",
+                "faces": [f.get("name") for f in faces or [] if f.get("name")],
+            }
+            if ocr_ok and faces_ok:
+                self._store_cached(key, vector, {**final_data, "faces_db": faces_db})
+            results[i] = (vector, final_data, monitors[i].get_summary())
+
+        return results
+
+    def _query_db(self) -> sqlite3.Connection:
+        if self._query_conn is None:
+            self._query_conn = sqlite3.connect(
+                str(self.data_dir / "query_cache.sqlite"), check_same_thread=False
+            )
+            self._query_conn.execute(
+                "CREATE TABLE IF NOT EXISTS text_emb (hash BLOB PRIMARY KEY, vec BLOB)"
+            )
+        return self._query_conn
+
+    def embed_query(self, query_text: str) -> np.ndarray:
+        """
+        Generate embedding for a text query (cached in memory and on disk).
+        Returned as a read-only float32 array, which Qdrant takes as-is, so
+        no per-element Python floats are built on the search path.
+        """
+        # CLIP's tokenizer lowercases and collapses whitespace itself, so queries
+        # differing only in case or spacing embed identically; share one entry
+        query_text = " ".join(query_text.lower().split())
+        with self._query_lock:
+            cached = self._query_lru.get(query_text)
+            if cached is not None:
+                self._query_lru.move_to_end(query_text)
+                return cached
+
+        # Model id is part of the key so switching CLIP models invalidates old entries
+        key = hashlib.sha256(f"{self.clip.hf_repo}|{query_text}".encode()).digest()
+        vector = None
+        try:
+            with self._query_lock:
+                row = self._query_db().execute(
+                    "SELECT vec FROM text_emb WHERE hash = ?", (key,)
+                ).fetchone()
+            if row is not None:
+                vector = np.frombuffer(row[0], dtype=np.float32)  # read-only view of the blob
+        except sqlite3.Error as e:
+            print(f"[Query Cache Error] {e}")
+
+        if vector is None:
+            self._warmup.result()
+            vector = np.asarray(self.clip.encode_text(query_text), dtype=np.float32)
+            vector.setflags(write=False)  # shared through the LRU
+            try:
+                with self._query_lock, self._query_db() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO text_emb (hash, vec) VALUES (?, ?)",
+                        (key, vector.tobytes()),
+                    )
+            except sqlite3.Error as e:
+                print(f"[Query Cache Error] {e}")
+
+        with self._query_lock:
+            self._query_lru[query_text] = vector
+            if len(self._query_lru) > self.QUERY_CACHE_SIZE:
+                self._query_lru.popitem(last=False)
+        return vector
 
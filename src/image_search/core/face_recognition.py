@@ -3,37 +3,152 @@ Face detection and recognition using DeepFace
 """
 from __future__ import annotations
 
+import hashlib
+import json
 import os
 import pickle
-import tempfile
+import re
+import threading
 from collections import defaultdict
 from pathlib import Path
-from typing import Any
+from typing import NamedTuple
 
 import numpy as np
 from PIL import Image
 
+from .imaging import load_image
 
-def _resize_for_detection(img_path: str, max_dim: int = 1024) -> str | None:
-    """Resize image if needed, return temp path or None if no resize needed."""
-    img = Image.open(img_path)
-    if max(img.size) <= max_dim:
+
+def _resize_for_detection(img_path: str | Image.Image, max_dim: int = 1024) -> np.ndarray:
+    """Decode an image downscaled to fit max_dim, as a BGR array for DeepFace/OpenCV."""
+    img = load_image(img_path, max_dim)
+    return np.ascontiguousarray(np.asarray(img)[:, :, ::-1])
+
+
+_cascades = threading.local()  # per-thread Haar cascades; detectMultiScale isn't thread-safe
+
+
+def _get_cascade(name: str = "haarcascade_frontalface_default.xml"):
+    """A Haar cascade DeepFace's "opencv" backend uses, loaded once per thread."""
+    cascade = getattr(_cascades, name, None)
+    if cascade is None:
+        import cv2
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + name)
+        setattr(_cascades, name, cascade)
+    return cascade
+
+
+def _align_eyes(face_bgr: np.ndarray) -> np.ndarray:
+    """
+    Rotate a face crop so its eyes are level, as DeepFace's opencv backend
+    does; returned unchanged if two eyes aren't found.
+    """
+    import cv2
+
+    gray = cv2.cvtColor(face_bgr, cv2.COLOR_BGR2GRAY)
+    eyes = _get_cascade("haarcascade_eye.xml").detectMultiScale(gray, 1.1, 10)
+    if len(eyes) < 2:
+        return face_bgr
+
+    # The two largest detections, ordered left to right in the image
+    eye_1, eye_2 = sorted(eyes, key=lambda e: e[2] * e[3], reverse=True)[:2]
+    right_eye, left_eye = sorted((eye_1, eye_2), key=lambda e: e[0])
+    rx, ry = right_eye[0] + right_eye[2] / 2, right_eye[1] + right_eye[3] / 2
+    lx, ly = left_eye[0] + left_eye[2] / 2, left_eye[1] + left_eye[3] / 2
+
+    angle = float(np.degrees(np.arctan2(ly - ry, lx - rx)))
+    h, w = face_bgr.shape[:2]
+    rotation = cv2.getRotationMatrix2D((w / 2, h / 2), angle, 1.0)
+    return cv2.warpAffine(face_bgr, rotation, (w, h), flags=cv2.INTER_CUBIC)
+
+
+def _detect_faces(img_bgr: np.ndarray) -> list[tuple[np.ndarray, dict]]:
+    """
+    Detect faces with the parameters DeepFace's opencv backend uses (so new
+    embeddings stay comparable with ones it produced) and align each on its
+    eyes. Returns [(RGB crop, box), ...], largest first.
+    """
+    import cv2
+
+    gray = cv2.cvtColor(img_bgr, cv2.COLOR_BGR2GRAY)
+    boxes = _get_cascade().detectMultiScale(gray, scaleFactor=1.1, minNeighbors=10)
+
+    faces = []
+    for x, y, w, h in sorted((tuple(int(v) for v in b) for b in boxes), key=lambda b: -b[2] * b[3]):
+        crop = _align_eyes(img_bgr[y:y + h, x:x + w])[:, :, ::-1]
+        faces.append((crop, {"x": x, "y": y, "w": w, "h": h}))
+    return faces
+
+
+def _prepare_face(face: np.ndarray, target_size: tuple[int, int]) -> np.ndarray:
+    """Letterbox an RGB face crop into model input (BGR, [0, 1]), as DeepFace.represent does."""
+    import cv2
+
+    img = np.asarray(face, dtype=np.float32)
+    if img.max() > 1.0:
+        img = img / 255.0
+    img = img[:, :, ::-1]
+
+    th, tw = target_size
+    h, w = img.shape[:2]
+    factor = min(th / h, tw / w)
+    img = cv2.resize(img, (max(1, int(w * factor)), max(1, int(h * factor))))
+
+    dh, dw = th - img.shape[0], tw - img.shape[1]
+    img = np.pad(img, ((dh // 2, dh - dh // 2), (dw // 2, dw - dw // 2), (0, 0)))
+    if img.shape[:2] != (th, tw):
+        img = cv2.resize(img, (tw, th))
+    return img
+
+
+def _build_faiss_index(mat: np.ndarray):
+    """Inner-product FAISS index over normalized rows, or None if faiss isn't installed."""
+    try:
+        import faiss
+    except ImportError:
         return None
-    img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
-    tmp = tempfile.NamedTemporaryFile(suffix=".jpg", delete=False)
-    img.save(tmp.name, "JPEG", quality=85)
-    return tmp.name
 
+    index = faiss.IndexFlatIP(mat.shape[1])
+    index.add(mat)
+    return index
+
+
+def _best_match_loop(mat: np.ndarray, queries: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Fused dot + argmax of each query row against normalized float32 rows of mat"""
+    n, dim = mat.shape
+    best_idx = np.zeros(queries.shape[0], dtype=np.int64)
+    best_sim = np.full(queries.shape[0], -1.0, dtype=np.float32)
+    for j in range(queries.shape[0]):
+        for i in range(n):
+            s = 0.0
+            for k in range(dim):
+                s += mat[i, k] * queries[j, k]
+            if s > best_sim[j]:
+                best_sim[j] = s
+                best_idx[j] = i
+    return best_idx, best_sim
+
+
+_numba_best_match = None  # compiled on first use; False if numba is unavailable
+
+
+def _get_numba_kernel():
+    """_best_match_loop compiled with numba, or None if numba isn't installed."""
+    global _numba_best_match
+    if _numba_best_match is None:
+        try:
+            from numba import njit
+            _numba_best_match = njit(cache=True, fastmath=True)(_best_match_loop)
+        except ImportError:
+            _numba_best_match = False
+    return _numba_best_match or None
 
-def _cosine_distance(a: Any, b: Any) -> float:
-    """Calculate cosine distance between two vectors"""
-    a = np.asarray(a, dtype=np.float32)
-    b = np.asarray(b, dtype=np.float32)
-    na = np.linalg.norm(a)
-    nb = np.linalg.norm(b)
-    if na == 0.0 or nb == 0.0:
-        return 1.0
-    return float(1.0 - np.dot(a, b) / (na * nb))
+
+class _KnownFaces(NamedTuple):
+    """Everything matching needs, published as one object so readers never mix versions"""
+    mat: np.ndarray  # L2-normalized (N, D) float32, one row per known embedding
+    names: list[str]  # person each row belongs to
+    index: object | None  # FAISS index over mat (optional)
 
 
 class FaceIdentifier:
@@ -41,35 +156,151 @@ class FaceIdentifier:
     Face detection and identification using DeepFace.
     
     Known faces are stored in: <data_dir>/known_faces/<person_name>/*.jpg
-    DB cache: <data_dir>/known_faces/known_faces_db.pkl
+    DB cache: <data_dir>/known_faces/known_faces.npy (embeddings, memory-mapped)
+              <data_dir>/known_faces/known_faces.json (person/file for each row)
+    (legacy known_faces_db.npz / .pkl caches are read and migrated on first load)
     """
 
     DISTANCE_THRESHOLD = 0.6  # Lower = more strict matching
+    EMBED_BATCH_SIZE = 32
+    NUMBA_MAX_ROWS = 64  # known embeddings below which the numba kernel is used
+    DETECTOR_VERSION = 2  # bump when detection changes, so cached face results are redone
 
     def __init__(self, data_dir: str | Path | None = None):
         self.data_dir = Path(data_dir) if data_dir else Path.cwd()
         self.known_faces_dir = self.data_dir / "known_faces"
-        self.db_path = self.known_faces_dir / "known_faces_db.pkl"
-        self.known_db: dict[str, dict[str, list]] = defaultdict(dict)
+        self.db_path = self.known_faces_dir / "known_faces.npy"
+        self.index_path = self.known_faces_dir / "known_faces.json"
+        self.legacy_npz_path = self.known_faces_dir / "known_faces_db.npz"
+        self.legacy_db_path = self.known_faces_dir / "known_faces_db.pkl"
+        self.known_db: dict[str, dict[str, np.ndarray]] = defaultdict(dict)
+
+        # Normalized embeddings, their names and FAISS index, rebuilt whenever
+        # known_db changes. Swapped in one assignment: embedder threads read it
+        # while the GUI or scan thread rebuilds it, so each call takes one snapshot
+        self._known: _KnownFaces | None = None
+        self._arcface = None  # lazy-loaded DeepFace ArcFace client
+        self._names_regex: re.Pattern | None = None  # matches any known name in free text
+        self._name_lookup: dict[str, str] = {}
+        self.db_version = ""  # changes whenever the set of reference photos does
 
         self._load_from_disk()
         self._scan_and_update_faces()
 
     def _load_from_disk(self):
         """Load cached face embeddings from disk"""
-        if self.db_path.exists():
-            try:
-                with self.db_path.open("rb") as f:
-                    self.known_db = defaultdict(dict, pickle.load(f))
+        try:
+            if self.db_path.exists() and self.index_path.exists():
+                # Rows are views into the mapped file; nothing is parsed or copied up front
+                mat = np.load(self.db_path, mmap_mode="r")
+                rows = json.loads(self.index_path.read_text())["rows"]
+                self.known_db = defaultdict(dict)
+                for (name, img_name), emb in zip(rows, mat):
+                    self.known_db[name][img_name] = emb
                 print(f"--- Loaded {len(self.known_db)} known people ---")
-            except Exception as e:
-                print(f"[Face DB Load Error] {e}")
+            elif self.legacy_npz_path.exists():
+                with np.load(self.legacy_npz_path) as data:
+                    mat, names, files = data["mat"], data["names"], data["files"]
+                self.known_db = defaultdict(dict)
+                for name, img_name, emb in zip(names.tolist(), files.tolist(), mat):
+                    self.known_db[name][img_name] = emb
+                print(f"--- Loaded {len(self.known_db)} known people (migrating npz) ---")
+                self._save_to_disk()
+            elif self.legacy_db_path.exists():
+                with self.legacy_db_path.open("rb") as f:
+                    legacy = pickle.load(f)
+                self.known_db = defaultdict(dict, {
+                    name: {k: np.asarray(v, dtype=np.float32) for k, v in examples.items()}
+                    for name, examples in legacy.items()
+                })
+                print(f"--- Loaded {len(self.known_db)} known people (migrating pickle) ---")
+                self._save_to_disk()
+        except Exception as e:
+            print(f"[Face DB Load Error] {e}")
+        self._rebuild_index()
 
     def _save_to_disk(self):
         """Save face embeddings to disk"""
         self.known_faces_dir.mkdir(parents=True, exist_ok=True)
-        with self.db_path.open("wb") as f:
-            pickle.dump(dict(self.known_db), f)
+
+        rows, embs = [], []
+        for name, examples in self.known_db.items():
+            for img_name, emb in examples.items():
+                rows.append([name, img_name])
+                embs.append(emb)
+
+        mat = np.vstack(embs).astype(np.float32) if embs else np.zeros((0, 0), np.float32)
+
+        # Write beside and rename: the current file may still be memory-mapped,
+        # and truncating it in place would invalidate those pages
+        tmp_path = self.db_path.with_suffix(".tmp.npy")
+        np.save(tmp_path, mat)
+        os.replace(tmp_path, self.db_path)
+
+        people: dict[str, list[str]] = defaultdict(list)
+        for name, img_name in rows:
+            people[name].append(img_name)
+        self.index_path.write_text(json.dumps({"people": people, "rows": rows}))
+        self._rebuild_index()
+
+    def _rebuild_index(self):
+        """Stack known embeddings into a normalized matrix for vectorized matching"""
+        names, embs, keys = [], [], []
+        for name, examples in self.known_db.items():
+            for img_name, emb in examples.items():
+                names.append(name)
+                embs.append(emb)
+                keys.append(f"{name}/{img_name}")
+        self.db_version = hashlib.blake2b(
+            "\n".join([f"detector:{self.DETECTOR_VERSION}", *sorted(keys)]).encode(), digest_size=8
+        ).hexdigest() if keys else ""
+
+        # One alternation over every name, longest first so "Ann Marie" beats "Ann"
+        people = sorted(self.known_db, key=len, reverse=True)
+        self._name_lookup = {name.lower(): name for name in people}
+        self._names_regex = re.compile(
+            r"(?<!\w)(" + "|".join(re.escape(n) for n in people) + r")(?!\w)", re.IGNORECASE
+        ) if people else None
+
+        if not embs:
+            self._known = None
+            return
+
+        mat = np.ascontiguousarray(np.vstack(embs), dtype=np.float32)
+        norms = np.linalg.norm(mat, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        mat = mat / norms
+        self._known = _KnownFaces(mat, names, _build_faiss_index(mat))
+
+    def find_mentioned(self, text: str) -> list[str]:
+        """Known people named in text (whole words, case-insensitive)"""
+        if self._names_regex is None:
+            return []
+        found = (self._name_lookup.get(m.lower(), m) for m in self._names_regex.findall(text))
+        return list(dict.fromkeys(found))
+
+    def _best_matches(
+        self, known: _KnownFaces, embeddings: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Nearest known embedding for each query row. Returns (row indices, cosine distances)."""
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0.0] = 1.0
+        queries = np.ascontiguousarray(embeddings / norms, dtype=np.float32)
+
+        # Small rosters: the fused numba loop beats FAISS/BLAS call overhead
+        if len(known.mat) < self.NUMBA_MAX_ROWS:
+            kernel = _get_numba_kernel()
+            if kernel is not None:
+                best_idx, best_sim = kernel(known.mat, queries)
+                return best_idx, 1.0 - best_sim
+
+        if known.index is not None:
+            sims, idx = known.index.search(queries, 1)
+            return idx[:, 0], 1.0 - sims[:, 0]
+
+        sims = queries @ known.mat.T
+        best_idx = sims.argmax(axis=1)
+        return best_idx, 1.0 - sims[np.arange(len(queries)), best_idx]
 
     def _scan_and_update_faces(self):
         """Scan known_faces directory for new reference photos"""
@@ -77,101 +308,139 @@ class FaceIdentifier:
             self.known_faces_dir.mkdir(parents=True, exist_ok=True)
             return
 
+        # Forget people whose reference folder has been deleted
+        removed = [p for p in self.known_db if not (self.known_faces_dir / p).is_dir()]
+        if removed:
+            for person in removed:
+                del self.known_db[person]
+            self._save_to_disk()
+
+        # scandir entries carry the file type from the directory read, so no stat per entry
+        with os.scandir(self.known_faces_dir) as people:
+            person_dirs = [(e.name, e.path) for e in people if e.is_dir()]
+
+        new_files = []  # (person, img_name, img_path)
+        for person, p_dir in person_dirs:
+            # .get so that looking up a new person doesn't insert an empty entry
+            known = set(self.known_db.get(person, ()))
+            with os.scandir(p_dir) as entries:
+                new_files.extend(
+                    (person, e.name, e.path) for e in entries
+                    if e.name.lower().endswith((".jpg", ".jpeg", ".png"))
+                    and e.name not in known and e.is_file()
+                )
+
+        # Only pay for importing DeepFace (and TensorFlow) when there is something to learn
+        if not new_files:
+            return
         try:
-            from deepface import DeepFace
+            from deepface import DeepFace  # noqa: F401
         except Exception as e:
             print(f"[DeepFace Missing] {e}")
             return
 
-        updates = False
-        for person in os.listdir(self.known_faces_dir):
-            p_dir = self.known_faces_dir / person
-            if not p_dir.is_dir():
-                continue
-
-            for img_name in os.listdir(p_dir):
-                if not img_name.lower().endswith((".jpg", ".jpeg", ".png")):
-                    continue
-                if img_name in self.known_db[person]:
-                    continue
-
-                img_path = str(p_dir / img_name)
-                print(f"Learning face: {person} ({img_name})")
-                try:
-                    emb = DeepFace.represent(
-                        img_path=img_path,
-                        model_name="ArcFace",
-                        detector_backend="opencv",
-                        enforce_detection=False,
-                    )[0]["embedding"]
-                    self.known_db[person][img_name] = emb
-                    updates = True
-                except Exception as e:
-                    print(f"Skipped {img_name}: {e}")
-
-        if updates:
-            self._save_to_disk()
+        # Detect faces one image at a time, then embed them all in one batch
+        pending = []  # (person, img_name, face)
+        for person, img_name, img_path in new_files:
+            print(f"Learning face: {person} ({img_name})")
+            try:
+                img_bgr = _resize_for_detection(img_path)
+                detected = _detect_faces(img_bgr)
+                # Largest face in the reference photo, or the whole photo if none is found
+                face = detected[0][0] if detected else img_bgr[:, :, ::-1]
+                pending.append((person, img_name, face))
+            except Exception as e:
+                print(f"Skipped {img_name}: {e}")
 
-    def detect_and_name(self, img_path: str) -> list[dict]:
+        if not pending:
+            return
+
+        try:
+            embeddings = self._embed_faces([face for _, _, face in pending])
+        except Exception as e:
+            print(f"[Face Embedding Error] {e}")
+            return
+
+        for (person, img_name, _), emb in zip(pending, embeddings):
+            self.known_db[person][img_name] = emb
+        self._save_to_disk()
+
+    def _get_arcface(self):
+        """Build the ArcFace model once and reuse it for every embedding call"""
+        if self._arcface is None:
+            from deepface import DeepFace
+            self._arcface = DeepFace.build_model("ArcFace")
+        return self._arcface
+
+    def _embed_faces(self, faces: list[np.ndarray]) -> np.ndarray:
+        """Embed face crops with ArcFace in batched forward passes. Returns (N, D) float32."""
+        client = self._get_arcface()
+        model = getattr(client, "model", client)
+        target_size = tuple(getattr(client, "input_shape", (112, 112)))
+
+        batch = np.stack([_prepare_face(face, target_size) for face in faces])
+
+        # Call the Keras model directly: predict() sets up a new data pipeline per call
+        step = self.EMBED_BATCH_SIZE
+        chunks = [
+            np.asarray(model(batch[i:i + step], training=False))
+            for i in range(0, len(batch), step)
+        ]
+        return np.concatenate(chunks).astype(np.float32, copy=False)
+
+    def warm_up(self):
+        """Load the detector and ArcFace and run one dummy batch, so the first real image doesn't pay for it"""
+        if self._known is None:
+            return  # detect_and_name won't touch either model
+        try:
+            _get_cascade()
+            self._embed_faces([np.zeros((112, 112, 3), dtype=np.uint8)])
+        except Exception as e:
+            print(f"[Face Warmup Error] {e}")
+
+    def detect_and_name(self, img_path: str | Image.Image, raise_errors: bool = False) -> list[dict]:
         """
-        Detect faces in image and identify known people.
+        Detect faces in image (a path or decoded PIL image) and identify known people.
+        Failures give [] unless raise_errors is set.
         
         Returns:
             List of dicts: [{'name': 'person', 'confidence': 0.92, 'box': {...}}, ...]
         """
         try:
-            from deepface import DeepFace
+            from deepface import DeepFace  # noqa: F401
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"[DeepFace Missing] {e}")
             return []
 
-        # Resize for speed
-        tmp_path = _resize_for_detection(img_path)
-        detect_path = tmp_path if tmp_path else img_path
+        known = self._known  # one snapshot for the whole call
+        if known is None:
+            return []
 
         try:
-            faces = DeepFace.extract_faces(
-                img_path=detect_path,
-                detector_backend="opencv",
-                enforce_detection=False,
-            )
+            # Resize for speed
+            img_bgr = _resize_for_detection(img_path)
+            faces = _detect_faces(img_bgr)
+            if not faces:
+                return []
+            # One batched ArcFace pass for every face in the image
+            embeddings = self._embed_faces([face for face, _ in faces])
         except Exception:
-            if tmp_path:
-                os.unlink(tmp_path)
+            if raise_errors:
+                raise
             return []
 
+        best_idx, best_dist = self._best_matches(known, embeddings)
+
         results = []
-        for face_obj in faces or []:
-            try:
-                curr_emb = DeepFace.represent(
-                    img_path=face_obj["face"],
-                    model_name="ArcFace",
-                    enforce_detection=False,
-                    detector_backend="skip",
-                )[0]["embedding"]
-            except Exception:
-                continue
-
-            best_name = "Unknown"
-            best_dist = self.DISTANCE_THRESHOLD
-
-            for name, examples in self.known_db.items():
-                for _, known_emb in examples.items():
-                    dist = _cosine_distance(known_emb, curr_emb)
-                    if dist < best_dist:
-                        best_dist = dist
-                        best_name = name
-
-            if best_name != "Unknown":
+        for (_, box), idx, dist in zip(faces, best_idx, best_dist):
+            if dist < self.DISTANCE_THRESHOLD:
                 results.append({
-                    "name": best_name,
-                    "confidence": 1.0 - float(best_dist),
-                    "box": face_obj.get("facial_area", {}),
+                    "name": known.names[idx],
+                    "confidence": 1.0 - float(dist),
+                    "box": box,
                 })
 
-        # Cleanup temp file
-        if tmp_path:
-            os.unlink(tmp_path)
-
         return results
 
@@ -0,0 +1,91 @@
+"""
+Image decoding helpers shared by the OCR and face pipelines
+"""
+from __future__ import annotations
+
+import mmap
+
+from PIL import Image
+
+_JPEG_EXTS = (".jpg", ".jpeg")
+
+_turbo = None  # TurboJPEG instance; False if unavailable
+
+
+def _get_turbojpeg():
+    """Shared TurboJPEG decoder, or None if PyTurboJPEG/libturbojpeg is missing."""
+    global _turbo
+    if _turbo is None:
+        try:
+            from turbojpeg import TurboJPEG
+            _turbo = TurboJPEG()
+        except Exception:
+            _turbo = False
+    return _turbo or None
+
+
+def _decode_jpeg_scaled(img_path: str, max_dim: int) -> Image.Image | None:
+    """
+    Decode a JPEG with libjpeg-turbo at the smallest DCT scale still covering max_dim.
+    Returns None if TurboJPEG is unavailable or can't decode the file, so the
+    caller falls back to PIL.
+    """
+    tj = _get_turbojpeg()
+    if tj is None:
+        return None
+
+    from turbojpeg import TJPF_RGB
+
+    # scaling_factors also lists upscales (9/8 .. 2/1); never decode above full size
+    factors = sorted(
+        (f for f in tj.scaling_factors if f[0] <= f[1]), key=lambda f: f[0] / f[1]
+    )
+
+    try:
+        # Decode straight from a read-only mapping so the compressed bytes stay
+        # in the page cache instead of a heap copy per image
+        with open(img_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            width, height, _, _ = tj.decode_header(data)
+
+            scale = (1, 1)
+            for num, denom in factors:
+                if max(width, height) * num / denom >= max_dim:
+                    scale = (num, denom)
+                    break
+
+            pixels = tj.decode(data, pixel_format=TJPF_RGB, scaling_factor=scale)
+    except Exception:
+        # Empty, truncated or misnamed files; PIL gives the real error if it can't cope either
+        return None
+
+    return Image.fromarray(pixels)
+
+
+def load_image(img_path: str | Image.Image, max_dim: int | None = None) -> Image.Image:
+    """
+    Decode an image as RGB, downscaled to fit within max_dim if given.
+
+    JPEGs are decoded at a reduced DCT scale (1/2, 1/4, 1/8) so decode and
+    most of the resize happen in one pass; the remainder uses LANCZOS.
+    An already-decoded PIL image is returned as is, or as a downscaled copy.
+    """
+    if isinstance(img_path, Image.Image):
+        img = img_path if img_path.mode == "RGB" else img_path.convert("RGB")
+        if max_dim and max(img.size) > max_dim:
+            img = img.copy()
+            img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+        return img
+
+    img = None
+    if max_dim and img_path.lower().endswith(_JPEG_EXTS):
+        img = _decode_jpeg_scaled(img_path, max_dim)
+
+    if img is None:
+        img = Image.open(img_path)
+        if max_dim:
+            img.draft("RGB", (max_dim, max_dim))  # PIL's DCT scaling for JPEG
+        img = img.convert("RGB")
+
+    if max_dim and max(img.size) > max_dim:
+        img.thumbnail((max_dim, max_dim), Image.Resampling.LANCZOS)
+    return img
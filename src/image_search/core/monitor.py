@@ -3,25 +3,40 @@ Performance monitoring utilities
 """
 import time
 import os
-
-import psutil
+import threading
 
 
 class PerformanceMonitor:
     """Track performance metrics for ML operations"""
     
-    def __init__(self):
+    def __init__(self, sample_memory: bool = False):
         self.metrics = {}
-        self.process = psutil.Process(os.getpid())
+        self.sample_memory = sample_memory
+        self.process = None
+        self._lock = threading.Lock()
+
+        # RSS probes are a syscall each; only pay for them when asked
+        if sample_memory:
+            import psutil
+            self.process = psutil.Process(os.getpid())
 
     def measure(self, task_name: str):
         return TaskTimer(self, task_name)
 
-    def record(self, task_name: str, duration: float, memory_diff: float):
-        self.metrics[task_name] = {
-            "latency_sec": round(duration, 4),
-            "ram_change_mb": round(memory_diff, 2),
-        }
+    def call(self, task_name: str, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) under a timer (safe to submit to a thread pool)"""
+        with self.measure(task_name):
+            return fn(*args, **kwargs)
+
+    def rss_mb(self) -> float:
+        return self.process.memory_info().rss / (1024 * 1024)
+
+    def record(self, task_name: str, duration: float, memory_diff: float | None):
+        with self._lock:
+            self.metrics[task_name] = {
+                "latency_sec": round(duration, 4),
+                "ram_change_mb": round(memory_diff, 2) if memory_diff is not None else None,
+            }
 
     def get_summary(self) -> dict:
         return self.metrics
@@ -37,12 +52,14 @@ class TaskTimer:
         self.start_ram = 0.0
 
     def __enter__(self):
+        if self.monitor.sample_memory:
+            self.start_ram = self.monitor.rss_mb()
         self.start_time = time.perf_counter()
-        self.start_ram = self.monitor.process.memory_info().rss / (1024 * 1024)
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         duration = time.perf_counter() - self.start_time
-        ram_diff = (self.monitor.process.memory_info().rss / (1024 * 1024)) - self.start_ram
+        ram_diff = None
+        if self.monitor.sample_memory:
+            ram_diff = self.monitor.rss_mb() - self.start_ram
         self.monitor.record(self.task_name, duration, ram_diff)
-
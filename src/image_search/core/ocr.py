@@ -4,44 +4,76 @@ OCR using Apple Vision Framework
 from __future__ import annotations
 
 import os
-import tempfile
 
+import numpy as np
 from PIL import Image
 
+from .imaging import load_image
+
+
+def _likely_has_text(img: Image.Image, min_glyphs: int = 2) -> bool:
+    """
+    Cheap pre-check for text: count connected components shaped like glyphs.
+    Errs towards True; textured photos pass, smooth ones (sky, portraits) don't.
+    Glyphs may be up to 60% of the image tall, so signs and titles count too.
+    """
+    import cv2
+
+    small = img.copy()
+    small.thumbnail((512, 512))
+    gray = np.asarray(small.convert("L"))
+
+    # Edges of strokes regardless of light-on-dark or dark-on-light text
+    grad = cv2.morphologyEx(gray, cv2.MORPH_GRADIENT, np.ones((3, 3), np.uint8))
+    _, mask = cv2.threshold(grad, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+
+    w = stats[1:, cv2.CC_STAT_WIDTH]
+    h = stats[1:, cv2.CC_STAT_HEIGHT]
+    glyphs = (h > 3) & (h < 0.6 * gray.shape[0]) & (w > 0.1 * h) & (w < 10 * h)
+    return int(glyphs.sum()) >= min_glyphs
+
 
 class OCR:
     """Extract text from images using macOS Vision Framework"""
     
-    def __init__(self, max_dim: int = 1024):
+    def __init__(self, max_dim: int = 1024, skip_textless: bool = False):
         self.max_dim = max_dim
+        # Opt-in: skip Vision for images _likely_has_text() rules out. Faster on
+        # photo libraries, but a missed sign or title is never searchable by its text
+        self.skip_textless = skip_textless
 
-    def process(self, img_path: str) -> str:
+    def process(self, img_path: str | Image.Image, raise_errors: bool = False) -> str:
         """
         Extract text using Apple's Vision Framework (via ocrmac).
+        Accepts a path or an already-decoded PIL image.
         Resizes large images first for speed.
+        Errors are printed and give "" unless raise_errors is set, which lets
+        callers tell a failure apart from an image without text.
         """
-        if not img_path or not os.path.exists(img_path):
+        if not isinstance(img_path, Image.Image) and (not img_path or not os.path.exists(img_path)):
             return ""
 
         try:
             from ocrmac.ocrmac import OCR as OCRMac
 
-            # Resize if needed for speed
-            img = Image.open(img_path)
-            if max(img.size) > self.max_dim:
-                img.thumbnail((self.max_dim, self.max_dim), Image.Resampling.LANCZOS)
-                with tempfile.NamedTemporaryFile(suffix=".jpg", delete=False) as tmp:
-                    img.save(tmp.name, "JPEG", quality=85)
-                    annotations = OCRMac(tmp.name).recognize()
-                os.unlink(tmp.name)
-            else:
-                annotations = OCRMac(img_path).recognize()
+            # Resize if needed for speed; ocrmac accepts the PIL image directly
+            img = load_image(img_path, self.max_dim)
+            if self.skip_textless and not _likely_has_text(img):
+                return ""
+            annotations = OCRMac(img).recognize()
 
             # annotations: [("Text", confidence, bbox), ...]
-            parts = [str(item[0]) for item in (annotations or []) if item and item[0]]
-            return " ".join(" ".join(parts).split())
+            # Split each fragment once and join the words, instead of joining,
+            # re-splitting and re-joining the whole text
+            return " ".join(
+                word for item in (annotations or []) if item and item[0]
+                for word in str(item[0]).split()
+            )
 
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"[OCR Error] {e}")
             return ""
 
@@ -4,15 +4,28 @@ Vector database and search engine
 from __future__ import annotations
 
 import os
+import threading
 import uuid
+from functools import lru_cache
 from pathlib import Path
 
+import numpy as np
 from qdrant_client import QdrantClient
 from qdrant_client.http import models
 
 from .embedder import ImageEmbedder
 
 
+@lru_cache(maxsize=65536)
+def _normalize(image_path: str) -> str:
+    """
+    pathlib's normalization of image_path, memoized since re-scans repeat paths.
+    Kept as str(Path(...)) rather than os.path.normpath, which also collapses
+    '..' and would change the IDs of points already indexed.
+    """
+    return str(Path(image_path))
+
+
 class SearchEngine:
     """
     Search engine combining vector similarity with face filtering.
@@ -21,17 +34,51 @@ class SearchEngine:
     
     COLLECTION_NAME = "personal_photos"
 
-    def __init__(self, data_dir: str | Path | None = None):
+    GRPC_POOL_SIZE = 32  # pooled gRPC channels for a Qdrant server (concurrent workers share them)
+
+    def __init__(self, data_dir: str | Path | None = None, profile_memory: bool = False,
+                 url: str | None = None, skip_textless: bool = False, max_workers: int = 3):
+        """
+        Args:
+            data_dir: Holds the embedded Qdrant DB (unless url is given), caches and faces
+            profile_memory: Sample RSS in the per-stage performance metrics
+            url: Qdrant server to use instead of the embedded DB; talked to over
+                gRPC, which handles concurrent searches/upserts better than REST
+            skip_textless: Skip OCR on images a cheap check finds no text in
+            max_workers: Threads the embedder runs OCR/face/CLIP stages on
+        """
         self.data_dir = Path(data_dir) if data_dir else Path.cwd()
+        self.profile_memory = profile_memory
+        self.skip_textless = skip_textless
+        self.max_workers = max_workers
 
         print("--- Initializing Qdrant DB ---")
-        self.client = QdrantClient(path=str(self.data_dir / "qdrant_db"))
+        if url:
+            self.client = QdrantClient(
+                url=url, prefer_grpc=True, timeout=30, pool_size=self.GRPC_POOL_SIZE,
+            )
+        else:
+            self.client = QdrantClient(path=str(self.data_dir / "qdrant_db"))
         self.embedder: ImageEmbedder | None = None  # lazy initialization
+        self._embedder_lock = threading.Lock()  # the GUI preloads while a search may also need it
+
+        # Every point ID in the collection, loaded once on the first add, so
+        # existence checks never go back to Qdrant
+        self._indexed_ids: set[str] = set()
+        self._ids_loaded = False
 
     def _init_embedder(self):
         """Lazy initialization of embedder (heavy ML models)"""
         if self.embedder is None:
-            self.embedder = ImageEmbedder(data_dir=self.data_dir)
+            with self._embedder_lock:
+                # A caller that waited on the lock finds the models already loaded
+                if self.embedder is None:
+                    self.embedder = ImageEmbedder(
+                        data_dir=self.data_dir,
+                        profile_memory=self.profile_memory,
+                        skip_textless=self.skip_textless,
+                        max_workers=self.max_workers,
+                    )
 
     def _ensure_collection(self, vector_size: int):
         """Create collection if it doesn't exist"""
@@ -43,6 +90,16 @@ class SearchEngine:
             vectors_config=models.VectorParams(
                 size=int(vector_size),
                 distance=models.Distance.COSINE,
+                datatype=models.Datatype.FLOAT16,  # half the storage of float32 originals
+                on_disk=True,  # originals stay on disk; searches run on the int8 copy in RAM
+            ),
+            # int8 scalar quantization: 4x smaller vectors for the hot search path
+            quantization_config=models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8,
+                    quantile=0.99,
+                    always_ram=True,
+                ),
             ),
         )
 
@@ -60,6 +117,56 @@ class SearchEngine:
         except Exception:
             pass
 
+    def _load_indexed_ids(self):
+        """Scroll every point ID once (no payloads or vectors) into _indexed_ids"""
+        if self._ids_loaded:
+            return
+        self._ids_loaded = True
+
+        offset = None
+        try:
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.COLLECTION_NAME,
+                    limit=1024,
+                    offset=offset,
+                    with_payload=False,
+                    with_vectors=False,
+                )
+                self._indexed_ids.update(str(p.id) for p in points)
+                if offset is None:
+                    break
+        except Exception:
+            pass  # Collection may not exist yet
+
+    def _resolve(self, image_path: str) -> str:
+        image_path = _normalize(image_path)
+        if not os.path.isabs(image_path):
+            image_path = os.path.join(self.data_dir, image_path)
+        return image_path
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def _doc_id(image_path: str) -> str:
+        """Deterministic ID for deduplication (memoized: re-scans reuse the same paths)"""
+        return str(uuid.uuid5(uuid.NAMESPACE_URL, image_path))
+
+    @staticmethod
+    def _make_point(doc_id: str, image_path: str, vector, metadata: dict, perf: dict):
+        return models.PointStruct(
+            id=doc_id,
+            # Rounded to fp16 like the embed cache and the FLOAT16 collection, so
+            # fresh and cached vectors store identically (even where the local
+            # client keeps float32)
+            vector=np.asarray(vector, dtype=np.float16).astype(np.float32).tolist(),
+            payload={
+                "path": image_path,
+                "ocr_text": metadata.get("ocr_text", ""),
+                "faces": metadata.get("faces", []),
+                "perf": perf,
+            },
+        )
+
     def add_image(self, image_path: str) -> bool:
         """
         Index an image for search.
@@ -69,56 +176,85 @@ class SearchEngine:
         """
         self._init_embedder()
 
-        image_path = str(Path(image_path))
-        if not os.path.isabs(image_path):
-            image_path = str(self.data_dir / image_path)
+        image_path = self._resolve(image_path)
+        doc_id = self._doc_id(image_path)
 
-        # Deterministic ID for deduplication
-        doc_id = str(uuid.uuid5(uuid.NAMESPACE_URL, image_path))
-        
-        try:
-            existing = self.client.retrieve(self.COLLECTION_NAME, ids=[doc_id])
-            if existing:
-                return False
-        except Exception:
-            pass  # Collection may not exist yet
+        self._load_indexed_ids()
+        if doc_id in self._indexed_ids:
+            return False
 
-        print(f"Indexing: {image_path}...")
         vector, metadata, perf = self.embedder.process(image_path)
         self._ensure_collection(vector_size=len(vector))
 
-        payload = {
-            "path": image_path,
-            "ocr_text": metadata.get("ocr_text", ""),
-            "faces": metadata.get("faces", []),
-            "perf": perf,
-        }
-
         self.client.upsert(
             collection_name=self.COLLECTION_NAME,
-            points=[
-                models.PointStruct(
-                    id=doc_id,
-                    vector=vector,
-                    payload=payload,
-                )
-            ],
+            points=[self._make_point(doc_id, image_path, vector, metadata, perf)],
         )
-        print(" -> Saved!")
+        self._indexed_ids.add(doc_id)
         return True
 
-    def _get_known_names(self) -> set[str]:
-        """Get list of known face names"""
+    def filter_new_paths(self, image_paths: list[str]) -> list[str]:
+        """Paths (as given, first occurrence only) that are not in the index yet"""
+        self._load_indexed_ids()
+        seen = set()
+        new_paths = []
+        for path in image_paths:
+            doc_id = self._doc_id(self._resolve(path))
+            if doc_id not in self._indexed_ids and doc_id not in seen:
+                seen.add(doc_id)
+                new_paths.append(path)
+        return new_paths
+
+    def add_images_batch(self, image_paths: list[str]) -> list[bool | None]:
+        """
+        Index several images with one batched embedding pass and one upsert.
+
+        Returns:
+            Per path, in order: True if indexed, False if already exists,
+            None if the image couldn't be processed
+        """
         self._init_embedder()
-        return set(self.embedder.face_identifier.known_db.keys())
 
-    def search(self, query_text: str, limit: int = 20) -> list[tuple]:
+        paths = [self._resolve(p) for p in image_paths]
+        ids = [self._doc_id(p) for p in paths]
+
+        self._load_indexed_ids()
+        existing = {doc_id for doc_id in ids if doc_id in self._indexed_ids}
+
+        status: list[bool | None] = [False] * len(ids)
+        todo = []
+        for i, doc_id in enumerate(ids):
+            if doc_id not in existing:
+                existing.add(doc_id)  # a path repeated within the batch is embedded once
+                status[i] = None
+                todo.append(i)
+        if not todo:
+            return status
+
+        points = []
+        results = self.embedder.process_batch([paths[i] for i in todo])
+        for i, result in zip(todo, results):
+            if result is None:
+                continue
+            vector, metadata, perf = result
+            points.append(self._make_point(ids[i], paths[i], vector, metadata, perf))
+            status[i] = True
+
+        if points:
+            self._ensure_collection(vector_size=len(points[0].vector))
+            self.client.upsert(collection_name=self.COLLECTION_NAME, points=points)
+            self._indexed_ids.update(str(p.id) for p in points)
+        return status
+
+    def search(self, query_text: str, limit: int = 20, rescore: bool = False) -> list[tuple]:
         """
         Search for images matching query.
         
         Args:
             query_text: Natural language query
             limit: Maximum results to return
+            rescore: Re-rank the quantized candidates with the original vectors
+                (Qdrant server only; embedded mode always searches the originals)
             
         Returns:
             List of (path, score, ocr_text, faces)
@@ -130,9 +266,7 @@ class SearchEngine:
         self._ensure_collection(vector_size=len(query_vector))
 
         # Check if query mentions a known person → add face filter
-        query_lower = query_text.lower()
-        known_names = self._get_known_names()
-        mentioned_names = [n for n in known_names if n.lower() in query_lower]
+        mentioned_names = self.embedder.face_identifier.find_mentioned(query_text)
 
         query_filter = None
         if mentioned_names:
@@ -149,6 +283,11 @@ class SearchEngine:
             collection_name=self.COLLECTION_NAME,
             query=query_vector,
             query_filter=query_filter,
+            # Sent either way so the flag really switches rescoring; the embedded
+            # (local) client ignores quantization, so it only matters on a server
+            search_params=models.SearchParams(
+                quantization=models.QuantizationSearchParams(rescore=rescore)
+            ),
             limit=int(limit),
         )
 
@@ -162,27 +301,56 @@ class SearchEngine:
             ))
         return results
 
-    def get_all_images(self, limit: int = 1000) -> list[tuple]:
-        """Get all indexed images"""
+    def iter_images(self, batch_size: int = 512):
+        """
+        Stream indexed images page by page as (path, {"faces", "ocr_text"}).
+        Only the payload fields used here are fetched (not "perf").
+        """
+        offset = None
         try:
-            scroll_result = self.client.scroll(
-                collection_name=self.COLLECTION_NAME,
-                limit=limit,
-                with_payload=True,
-                with_vectors=False,
-            )
-            
-            results = []
-            for point in scroll_result[0]:
-                path = point.payload.get("path", "")
-                if path and Path(path).exists():
-                    results.append((path, {
+            while True:
+                points, offset = self.client.scroll(
+                    collection_name=self.COLLECTION_NAME,
+                    limit=batch_size,
+                    offset=offset,
+                    with_payload=["path", "faces", "ocr_text"],
+                    with_vectors=False,
+                )
+                for point in points:
+                    yield point.payload.get("path", ""), {
                         "faces": point.payload.get("faces", []),
                         "ocr_text": point.payload.get("ocr_text", ""),
-                    }))
-            return results
+                    }
+                if offset is None:
+                    return
         except Exception:
-            return []
+            return
+
+    def iter_all_images(self, page_size: int = 100, limit: int | None = None):
+        """
+        Yield indexed images whose files still exist, as lists of up to
+        page_size (path, metadata) tuples, so callers can show each page
+        while the next is fetched. Stops after limit images if given.
+        """
+        page = []
+        count = 0
+        for path, meta in self.iter_images(batch_size=page_size):
+            if not path or not os.path.exists(path):
+                continue
+            page.append((path, meta))
+            count += 1
+            if count == limit:
+                break
+            if len(page) >= page_size:
+                yield page
+                page = []
+        if page:
+            yield page
+
+    def get_all_images(self, limit: int = 1000) -> list[tuple]:
+        """Get all indexed images"""
+        pages = self.iter_all_images(page_size=min(limit, 512), limit=limit)
+        return [item for page in pages for item in page]
 
     def close(self):
         """Clean shutdown"""
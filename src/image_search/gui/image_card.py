@@ -4,12 +4,40 @@ Image card widget for displaying search results
 from pathlib import Path
 
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QPixmap, QPainter, QPainterPath, QColor
-from PyQt6.QtWidgets import (
-    QFrame, QVBoxLayout, QLabel, QGraphicsDropShadowEffect
-)
+from PyQt6.QtGui import QPixmap, QPixmapCache, QImage, QColor, QPainter
+from PyQt6.QtWidgets import QFrame, QVBoxLayout, QLabel
 
-from .theme import COLORS
+from .thumbnails import start_thumbnail, thumb_key
+
+CARD_SIZE = 180
+THUMB_INSET = 6  # margin between card edge and thumbnail, where the shadow falls
+
+_shadow = None
+
+
+def _card_shadow() -> QPixmap:
+    """
+    Soft shadow behind the thumbnail, drawn once and shared by every card.
+    Stacked translucent rounded rects approximate a blur without the
+    offscreen pass a QGraphicsDropShadowEffect costs on every repaint.
+    """
+    global _shadow
+    if _shadow is None:
+        _shadow = QPixmap(CARD_SIZE, CARD_SIZE)
+        _shadow.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(_shadow)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(0, 0, 0, 10))
+        thumb = CARD_SIZE - 2 * THUMB_INSET
+        for spread in range(THUMB_INSET, 0, -1):
+            painter.drawRoundedRect(
+                THUMB_INSET - spread, THUMB_INSET - spread + 2,
+                thumb + 2 * spread, thumb + 2 * spread,
+                8 + spread, 8 + spread,
+            )
+        painter.end()
+    return _shadow
 
 
 class ImageCard(QFrame):
@@ -24,98 +52,100 @@ class ImageCard(QFrame):
         self.score = score
         self.faces = faces or []
         self.ocr_text = ocr_text
+        self._thumb_task = None
+        self._pixmap_key = None
+        self._loaded = False
         self.setObjectName("imageCard")
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         
         self._setup_ui()
-        self._setup_effects()
         
     def _setup_ui(self):
         # Compact size - just thumbnail
-        self.setFixedSize(180, 180)
+        self.setFixedSize(CARD_SIZE, CARD_SIZE)
         layout = QVBoxLayout(self)
-        layout.setContentsMargins(6, 6, 6, 6)
+        layout.setContentsMargins(THUMB_INSET, THUMB_INSET, THUMB_INSET, THUMB_INSET)
         layout.setSpacing(0)
         
         # Thumbnail container
         self.thumbnail_label = QLabel()
         self.thumbnail_label.setFixedSize(168, 168)
         self.thumbnail_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        self.thumbnail_label.setStyleSheet(f"""
-            background-color: {COLORS['bg_tertiary']};
-            border-radius: 8px;
-        """)
+        # Styled by the theme stylesheet, so cards don't each parse their own CSS
+        self.thumbnail_label.setObjectName("cardThumbnail")
         
-        # Load and display thumbnail
-        self._load_thumbnail()
+        # Thumbnail is loaded by ensure_loaded() once the card scrolls into view
         layout.addWidget(self.thumbnail_label)
         
-    def _load_thumbnail(self):
-        """Load and scale image thumbnail"""
-        pixmap = QPixmap(self.image_path)
-        if pixmap.isNull():
+    def reset(self, image_path: str, score: float = 0.0,
+              faces: list = None, ocr_text: str = ""):
+        """Repoint a pooled card at another image, keeping its widgets and effects"""
+        self.cancel_thumbnail()
+        self.image_path = image_path
+        self.score = score
+        self.faces = faces or []
+        self.ocr_text = ocr_text
+        self._loaded = False
+        self.thumbnail_label.clear()
+
+    def ensure_loaded(self, priority: int = 0):
+        """Start loading the thumbnail if that hasn't happened yet (higher priority runs sooner)"""
+        if not self._loaded:
+            self._loaded = True
+            self._load_thumbnail(priority)
+
+    @property
+    def thumbnail_pending(self) -> bool:
+        return self._thumb_task is not None
+
+    def _load_thumbnail(self, priority: int = 0):
+        """
+        Show the thumbnail from QPixmapCache if another card already loaded it,
+        otherwise render it on the thread pool; the placeholder shows until it's ready
+        """
+        self._pixmap_key = thumb_key(self.image_path, 168)
+        if self._pixmap_key is not None:
+            pixmap = QPixmapCache.find(self._pixmap_key)
+            if pixmap is not None:
+                self.thumbnail_label.setPixmap(pixmap)
+                return
+        self._thumb_task = start_thumbnail(self.image_path, 168, priority)
+        self._thumb_task.signals.preview.connect(self._on_thumbnail_preview)
+        self._thumb_task.signals.ready.connect(self._on_thumbnail_ready)
+
+    def _on_thumbnail_preview(self, image: QImage):
+        """Show the quick first pass while the smooth one renders"""
+        if self._thumb_task is None or self.sender() is not self._thumb_task.signals:
+            return
+        self.thumbnail_label.setPixmap(QPixmap.fromImage(image))
+
+    def _on_thumbnail_ready(self, image: QImage):
+        # A result queued just before reset() belongs to the card's previous image
+        if self._thumb_task is None or self.sender() is not self._thumb_task.signals:
+            return
+        self._thumb_task = None
+        self._loaded = True
+        if image.isNull():
             self.thumbnail_label.setText("⚠️")
             return
-            
-        # Scale to cover (crop to square)
-        size = 168
-        w, h = pixmap.width(), pixmap.height()
-        
-        # Crop to square from center
-        if w > h:
-            x = (w - h) // 2
-            pixmap = pixmap.copy(x, 0, h, h)
-        elif h > w:
-            y = (h - w) // 2
-            pixmap = pixmap.copy(0, y, w, w)
-            
-        scaled = pixmap.scaled(
-            size, size,
-            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-            Qt.TransformationMode.SmoothTransformation
-        )
-        
-        # Create rounded corners
-        rounded = QPixmap(size, size)
-        rounded.fill(Qt.GlobalColor.transparent)
-        
-        painter = QPainter(rounded)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        pixmap = QPixmap.fromImage(image)
+        if self._pixmap_key is not None:
+            QPixmapCache.insert(self._pixmap_key, pixmap)
+        self.thumbnail_label.setPixmap(pixmap)
+
+    def cancel_thumbnail(self):
+        """Abandon a pending thumbnail; ensure_loaded() will request it again"""
+        if self._thumb_task is not None:
+            self._thumb_task.cancel()
+            self._thumb_task = None
+            self._loaded = False
         
-        path = QPainterPath()
-        path.addRoundedRect(0, 0, size, size, 8, 8)
-        painter.setClipPath(path)
-        painter.drawPixmap(0, 0, scaled)
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, _card_shadow())
         painter.end()
         
-        self.thumbnail_label.setPixmap(rounded)
-        
-    def _setup_effects(self):
-        """Add subtle shadow effect"""
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(16)
-        shadow.setOffset(0, 2)
-        shadow.setColor(QColor(0, 0, 0, 60))
-        self.setGraphicsEffect(shadow)
-        
-    def enterEvent(self, event):
-        self.setStyleSheet(f"""
-            QFrame#imageCard {{
-                background-color: {COLORS['bg_tertiary']};
-                border-radius: 10px;
-            }}
-        """)
-        super().enterEvent(event)
-        
-    def leaveEvent(self, event):
-        self.setStyleSheet(f"""
-            QFrame#imageCard {{
-                background-color: {COLORS['bg_secondary']};
-                border-radius: 10px;
-            }}
-        """)
-        super().leaveEvent(event)
-        
     def mousePressEvent(self, event):
         if event.button() == Qt.MouseButton.LeftButton:
             metadata = {
@@ -1,7 +1,9 @@
 """
 Scrollable image grid with lazy loading pagination
 """
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer
+from collections import deque
+
+from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QPoint
 from PyQt6.QtWidgets import (
     QWidget, QScrollArea, QGridLayout, QVBoxLayout, QHBoxLayout,
     QLabel, QPushButton
@@ -18,10 +20,21 @@ class ImageGrid(QScrollArea):
     load_more = pyqtSignal()  # request more images
     
     PAGE_SIZE = 40  # images per page
+    ROW_HEIGHT = 192  # 180 card + 12 spacing
+    PRELOAD_ROWS = 2  # rows above/below the viewport whose thumbnails load early
+    CANCEL_SCREENS = 2  # pending thumbnails further than this many screens away are dropped
+    CARDS_PER_TICK = 5  # cards added per event-loop pass, so input stays responsive
+    MAX_POOL = 3 * PAGE_SIZE  # hidden cards kept for reuse; the rest of a big grid is freed
     
     def __init__(self, parent=None):
         super().__init__(parent)
         self.cards = []
+        self._pool = []  # hidden ImageCards kept for reuse by the next search
+        self._pending = deque()  # data items waiting to become cards
+        self._drain_scheduled = False
+        self._reflow_timer = QTimer(self)
+        self._reflow_timer.setSingleShot(True)
+        self._reflow_timer.timeout.connect(self._reflow_grid)
         self.columns = 5
         self._all_data = []  # full dataset
         self._loaded_count = 0  # how many loaded so far
@@ -118,9 +131,19 @@ class ImageGrid(QScrollArea):
         self.load_more_btn.hide()
         
     def _clear_grid(self):
-        """Remove all items from grid"""
+        """
+        Remove all items from grid; up to MAX_POOL cards go back to the pool
+        instead of being deleted, so one huge result set doesn't stay resident
+        """
+        self._pending.clear()
         for card in self.cards:
-            card.deleteLater()
+            card.cancel_thumbnail()
+            card.hide()
+            self.grid_layout.removeWidget(card)
+            if len(self._pool) < self.MAX_POOL:
+                self._pool.append(card)
+            else:
+                card.deleteLater()
         self.cards.clear()
         
         while self.grid_layout.count():
@@ -129,21 +152,46 @@ class ImageGrid(QScrollArea):
                 item.widget().deleteLater()
                 
     def _add_cards(self, data_slice: list):
-        """Add cards for a slice of data"""
-        start_idx = len(self.cards)
-        
-        for i, item in enumerate(data_slice):
-            idx = start_idx + i
+        """Queue cards for a slice of data; they are created a few per event-loop pass"""
+        self._pending.extend(data_slice)
+        if not self._drain_scheduled:
+            self._drain_scheduled = True
+            QTimer.singleShot(0, self._drain_pending)
             
-            # Extract data based on mode
-            if self._is_search_mode:
-                path, score, ocr_text, faces = item
-            else:
-                path, metadata = item
-                score = 0
-                faces = metadata.get("faces", [])
-                ocr_text = metadata.get("ocr_text", "")
+    def _drain_pending(self):
+        """Create the next CARDS_PER_TICK queued cards, then yield to the event loop"""
+        self._drain_scheduled = False
+        # One layout/paint pass for the whole chunk rather than one per card
+        self.grid_widget.setUpdatesEnabled(False)
+        try:
+            for _ in range(min(self.CARDS_PER_TICK, len(self._pending))):
+                self._add_card(self._pending.popleft())
+        finally:
+            self.grid_widget.setUpdatesEnabled(True)
+            
+        if self._pending:
+            self._drain_scheduled = True
+            QTimer.singleShot(0, self._drain_pending)
             
+        # Card geometry is only known after the layout runs
+        QTimer.singleShot(0, self._load_visible)
+        
+    def _add_card(self, item):
+        idx = len(self.cards)
+        
+        # Extract data based on mode
+        if self._is_search_mode:
+            path, score, ocr_text, faces = item
+        else:
+            path, metadata = item
+            score = 0
+            faces = metadata.get("faces", [])
+            ocr_text = metadata.get("ocr_text", "")
+        
+        if self._pool:
+            card = self._pool.pop()
+            card.reset(path, score, faces, ocr_text)
+        else:
             card = ImageCard(
                 image_path=path,
                 score=score,
@@ -151,11 +199,38 @@ class ImageGrid(QScrollArea):
                 ocr_text=ocr_text
             )
             card.clicked.connect(self._on_card_clicked)
-            
-            row = idx // self.columns
-            col = idx % self.columns
-            self.grid_layout.addWidget(card, row, col)
-            self.cards.append(card)
+        
+        row = idx // self.columns
+        col = idx % self.columns
+        self.grid_layout.addWidget(card, row, col)
+        card.show()
+        self.cards.append(card)
+
+    def _load_visible(self):
+        """
+        Queue thumbnails for cards in (or within PRELOAD_ROWS of) the viewport,
+        nearest the viewport centre first so rows fill in alternately above and
+        below it. Pending loads for cards scrolled far away are cancelled, so a
+        fast scroll doesn't leave the pool busy with rows no longer on screen.
+        """
+        top = self.verticalScrollBar().value()
+        height = self.viewport().height()
+        center = top + height / 2
+        load_reach = height / 2 + self.PRELOAD_ROWS * self.ROW_HEIGHT
+        cancel_reach = height / 2 + self.CANCEL_SCREENS * height
+
+        wanted = []  # (row distance from centre, card)
+        for card in self.cards:
+            y = card.mapTo(self.container, QPoint(0, 0)).y() + card.height() / 2
+            dist = abs(y - center)
+            if dist <= load_reach:
+                wanted.append((dist / self.ROW_HEIGHT, card))
+            elif dist > cancel_reach and card.thumbnail_pending:
+                card.cancel_thumbnail()
+
+        wanted.sort(key=lambda item: item[0])
+        for rows_away, card in wanted:
+            card.ensure_loaded(priority=-int(rows_away))
             
     def _load_next_page(self):
         """Load next page of images"""
@@ -167,8 +242,9 @@ class ImageGrid(QScrollArea):
         data_slice = self._all_data[self._loaded_count:end]
         self._add_cards(data_slice)
         self._loaded_count = end
+        self._update_load_more()
         
-        # Update button
+    def _update_load_more(self):
         remaining = len(self._all_data) - self._loaded_count
         if remaining > 0:
             self.load_more_btn.setText(f"Load More ({remaining} remaining)")
@@ -177,7 +253,8 @@ class ImageGrid(QScrollArea):
             self.load_more_btn.hide()
             
     def _on_scroll(self, value):
-        """Auto-load more when near bottom"""
+        """Load thumbnails coming into view; auto-load more when near bottom"""
+        self._load_visible()
         scrollbar = self.verticalScrollBar()
         if scrollbar.maximum() > 0:
             ratio = value / scrollbar.maximum()
@@ -189,32 +266,49 @@ class ImageGrid(QScrollArea):
         Display search results in grid
         results: [(path, score, ocr_text, faces), ...]
         """
-        self._clear_grid()
-        self._all_data = results
-        self._loaded_count = 0
-        self._is_search_mode = True
-        
-        if not results:
-            self._show_empty_state("No images found")
-            return
-            
-        self._load_next_page()
+        self._display(results, True, "No images found")
             
     def display_indexed_images(self, images: list):
         """
         Display all indexed images (for browse mode)
         images: [(path, metadata), ...]
         """
-        self._clear_grid()
-        self._all_data = images
-        self._loaded_count = 0
-        self._is_search_mode = False
+        self._display(images, False, "No images indexed yet.\nDrag & drop images to add them.")
         
-        if not images:
-            self._show_empty_state("No images indexed yet.\nDrag & drop images to add them.")
+    def append_indexed_images(self, images: list):
+        """
+        Add another page of browse results after display_indexed_images(),
+        as they stream in; cards are only created for them once needed
+        """
+        if self._is_search_mode:
+            return  # search results replaced the browse meanwhile
+        if not self._all_data:
+            self.display_indexed_images(images)
             return
+        self._all_data.extend(images)
+        # Fill out a first page that the earlier results left short
+        if self._loaded_count < self.PAGE_SIZE:
+            self._load_next_page()
+        else:
+            self._update_load_more()
             
-        self._load_next_page()
+    def _display(self, data: list, search_mode: bool, empty_message: str):
+        # Clear and refill with repaints off, so the old grid, the empty grid
+        # and the new one aren't each painted in turn
+        self.setUpdatesEnabled(False)
+        try:
+            self._clear_grid()
+            self._all_data = list(data)  # browse pages are appended to it later
+            self._loaded_count = 0
+            self._is_search_mode = search_mode
+            
+            if not data:
+                self._show_empty_state(empty_message)
+                return
+                
+            self._load_next_page()
+        finally:
+            self.setUpdatesEnabled(True)
             
     def _on_card_clicked(self, path: str, metadata: dict):
         self.image_clicked.emit(path, metadata)
@@ -226,8 +320,11 @@ class ImageGrid(QScrollArea):
         new_cols = max(2, width // card_width)
         if new_cols != self.columns:
             self.columns = new_cols
-            self._reflow_grid()
+            # Coalesce the stream of resize events from a window drag into one reflow
+            self._reflow_timer.start(50)
         super().resizeEvent(event)
+        # A taller window or a reflow can bring unloaded cards into view
+        QTimer.singleShot(0, self._load_visible)
         
     def _reflow_grid(self):
         """Reflow cards to new column count"""
@@ -235,3 +332,4 @@ class ImageGrid(QScrollArea):
             row = idx // self.columns
             col = idx % self.columns
             self.grid_layout.addWidget(card, row, col)
+        QTimer.singleShot(0, self._load_visible)
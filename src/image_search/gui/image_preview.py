@@ -1,16 +1,18 @@
 """
 Full-screen image preview dialog
 """
+import os
 from pathlib import Path
 
 from PyQt6.QtCore import Qt, QSize
-from PyQt6.QtGui import QPixmap, QKeyEvent, QFont
+from PyQt6.QtGui import QPixmap, QPixmapCache, QImage, QKeyEvent, QFont
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
     QFrame, QScrollArea, QWidget, QApplication
 )
 
 from .theme import COLORS
+from .thumbnails import start_preview, thumb_key
 
 
 class ImagePreviewDialog(QDialog):
@@ -20,8 +22,14 @@ class ImagePreviewDialog(QDialog):
         super().__init__(parent)
         self.image_path = image_path
         self.metadata = metadata or {}
-        
-        self.setWindowTitle(Path(image_path).name)
+        self._preview_task = None
+        self._path = Path(image_path)
+        try:
+            self._stat = os.stat(image_path)
+        except OSError:
+            self._stat = None
+        
+        self.setWindowTitle(self._path.name)
         self.setModal(True)
         self.setMinimumSize(900, 700)
         
@@ -88,7 +96,7 @@ class ImagePreviewDialog(QDialog):
         layout.setContentsMargins(20, 0, 20, 0)
         
         # Title
-        title = QLabel(Path(self.image_path).name)
+        title = QLabel(self._path.name)
         title.setStyleSheet(f"""
             font-size: 15px;
             font-weight: 600;
@@ -132,26 +140,37 @@ class ImagePreviewDialog(QDialog):
             }}
         """)
         
-        image_label = QLabel()
-        image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        image_label.setStyleSheet("background-color: transparent;")
-        
-        # Load image
-        pixmap = QPixmap(self.image_path)
-        if not pixmap.isNull():
-            # Scale to fit dialog while maintaining aspect ratio
-            scaled = pixmap.scaled(
-                800, 600,
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label.setStyleSheet("background-color: transparent;")
+        
+        # Show the grid thumbnail straight away if it's in memory, then swap
+        # in the full image once it has been decoded off the GUI thread
+        key = thumb_key(self.image_path, 168)
+        thumb = QPixmapCache.find(key) if key is not None else None
+        if thumb is not None:
+            self.image_label.setPixmap(thumb.scaled(
+                600, 600,
                 Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation
-            )
-            image_label.setPixmap(scaled)
+                Qt.TransformationMode.FastTransformation
+            ))
         else:
-            image_label.setText("Failed to load image")
+            self.image_label.setText("Loading…")
+        
+        # Decoded straight to a size that fits the dialog, keeping aspect ratio
+        self._preview_task = start_preview(self.image_path, 800, 600)
+        self._preview_task.signals.ready.connect(self._on_image_ready)
             
-        scroll.setWidget(image_label)
+        scroll.setWidget(self.image_label)
         return scroll
         
+    def _on_image_ready(self, image: QImage):
+        self._preview_task = None
+        if image.isNull():
+            self.image_label.setText("Failed to load image")
+            return
+        self.image_label.setPixmap(QPixmap.fromImage(image))
+        
     def _create_info_panel(self) -> QFrame:
         panel = QFrame()
         panel.setFixedWidth(280)
@@ -169,12 +188,11 @@ class ImagePreviewDialog(QDialog):
         # File info section
         file_section = self._create_section("File Info")
         
-        path = Path(self.image_path)
-        file_section.addWidget(self._create_info_row("Name", path.name))
-        file_section.addWidget(self._create_info_row("Type", path.suffix.upper()[1:]))
+        file_section.addWidget(self._create_info_row("Name", self._path.name))
+        file_section.addWidget(self._create_info_row("Type", self._path.suffix.upper()[1:]))
         
-        if path.exists():
-            size_mb = path.stat().st_size / (1024 * 1024)
+        if self._stat is not None:
+            size_mb = self._stat.st_size / (1024 * 1024)
             file_section.addWidget(self._create_info_row("Size", f"{size_mb:.2f} MB"))
             
         layout.addLayout(file_section)
@@ -263,6 +281,12 @@ class ImagePreviewDialog(QDialog):
         import subprocess
         subprocess.run(["open", "-R", self.image_path])
         
+    def done(self, result: int):
+        if self._preview_task is not None:
+            self._preview_task.cancel()
+            self._preview_task = None
+        super().done(result)
+        
     def keyPressEvent(self, event: QKeyEvent):
         if event.key() == Qt.Key.Key_Escape:
             self.close()
@@ -1,11 +1,15 @@
 """
 Auto-discover images from macOS standard locations
 """
+import heapq
 import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Set
+from typing import Callable, List, Set
 
 from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtGui import QImageReader
 
 
 # Common image extensions
@@ -17,6 +21,27 @@ SKIP_DIRS = {
     'Library', 'Applications', '.cache', '.npm', '.venv', 'venv',
 }
 
+_IMAGE_EXTS = frozenset(IMAGE_EXTENSIONS)
+
+# Formats whose Qt plugin goes by a different name than the file extension
+_FORMAT_ALIASES = {'jpeg': {'.jpg', '.jpeg'}, 'tiff': {'.tif', '.tiff'}, 'heif': {'.heic', '.heif'}}
+
+
+def _is_image_name(name: str) -> bool:
+    """Extension check on the bare filename, without building a Path per entry"""
+    dot = name.rfind('.')
+    return dot != -1 and name[dot:].lower() in _IMAGE_EXTS
+
+
+@lru_cache(maxsize=1)
+def displayable_extensions() -> frozenset:
+    """Extensions from IMAGE_EXTENSIONS that the installed Qt image plugins can decode"""
+    formats = {bytes(f).decode().lower() for f in QImageReader.supportedImageFormats()}
+    exts = set()
+    for fmt in formats:
+        exts.update(_FORMAT_ALIASES.get(fmt, {'.' + fmt}))
+    return frozenset(exts & _IMAGE_EXTS)
+
 
 def get_macos_image_locations() -> List[Path]:
     """Get standard macOS locations where photos are typically stored"""
@@ -38,41 +63,38 @@ def get_macos_image_locations() -> List[Path]:
     return [loc for loc in locations if loc.exists()]
 
 
-def scan_directory(directory: Path, max_depth: int = 5) -> List[str]:
+def scan_directory(directory: Path, max_depth: int = 5,
+                   should_stop: Callable[[], bool] = None) -> List[str]:
     """
-    Recursively scan directory for images
+    Scan directory tree for images
     
     Args:
         directory: Root directory to scan
-        max_depth: Maximum recursion depth
+        max_depth: Maximum directory depth below the root
+        should_stop: Checked before each directory; returning True ends the scan early
         
     Returns:
         List of image file paths
     """
     images = []
+    top = os.path.normpath(directory)
+    base_depth = top.count(os.sep)
     
-    def _scan(path: Path, depth: int):
-        if depth > max_depth:
-            return
+    # Unreadable directories are skipped silently (onerror ignores them)
+    for root, dirs, files in os.walk(top, topdown=True, onerror=lambda e: None):
+        if should_stop is not None and should_stop():
+            break
             
-        try:
-            for entry in os.scandir(path):
-                if entry.name.startswith('.'):
-                    continue
-                    
-                if entry.is_dir(follow_symlinks=False):
-                    if entry.name not in SKIP_DIRS:
-                        _scan(Path(entry.path), depth + 1)
-                elif entry.is_file():
-                    ext = Path(entry.name).suffix.lower()
-                    if ext in IMAGE_EXTENSIONS:
-                        images.append(entry.path)
-        except PermissionError:
-            pass
-        except OSError:
-            pass
+        # Pruning dirs in place keeps os.walk from descending into them
+        if root.count(os.sep) - base_depth >= max_depth:
+            dirs[:] = []
+        else:
+            dirs[:] = [d for d in dirs if d not in SKIP_DIRS and not d.startswith('.')]
             
-    _scan(directory, 0)
+        for name in files:
+            if not name.startswith('.') and _is_image_name(name):
+                images.append(os.path.join(root, name))
+                
     return images
 
 
@@ -89,6 +111,7 @@ class ImageScanner(QObject):
         super().__init__()
         self.locations = locations or get_macos_image_locations()
         self.max_images = max_images
+        self.skipped_unsupported = 0  # files found whose format Qt can't decode here
         self._cancelled = False
         
     def run(self):
@@ -97,25 +120,36 @@ class ImageScanner(QObject):
         all_images: Set[str] = set()
         
         try:
-            for location in self.locations:
-                if self._cancelled:
-                    break
-                    
-                if not location.exists():
-                    continue
-                    
-                self.progress.emit(str(location.name), len(all_images))
-                
-                # Scan this location
-                found = scan_directory(location)
-                all_images.update(found)
-                
-                # Cap at max_images
-                if len(all_images) >= self.max_images:
-                    break
+            # Locations are separate directory trees, so their metadata reads overlap well
+            locations = [loc for loc in dict.fromkeys(self.locations) if loc.exists()]
+            if locations:
+                def should_stop():
+                    return self._cancelled or len(all_images) >= self.max_images
+
+                with ThreadPoolExecutor(max_workers=min(len(locations), 4)) as executor:
+                    futures = {
+                        executor.submit(scan_directory, loc, should_stop=should_stop): loc
+                        for loc in locations
+                    }
+                    for future in as_completed(futures):
+                        all_images.update(future.result())
+                        self.progress.emit(str(futures[future].name), len(all_images))
+                        
+                        # Cap at max_images
+                        if self._cancelled or len(all_images) >= self.max_images:
+                            for f in futures:
+                                f.cancel()
+                            break
                     
-            # Convert to sorted list
-            result = sorted(all_images)[:self.max_images]
+            # Drop formats with no Qt plugin on this system (e.g. HEIC) rather than
+            # paying a failed decode for each of their thumbnails later
+            supported = displayable_extensions()
+            found = len(all_images)
+            all_images = {p for p in all_images if p[p.rfind('.'):].lower() in supported}
+            self.skipped_unsupported = found - len(all_images)
+            
+            # Sorted list of the first max_images paths, without sorting every path found
+            result = heapq.nsmallest(self.max_images, all_images)
             self.finished.emit(result)
             
         except Exception as e:
@@ -131,10 +165,9 @@ def quick_scan_count() -> int:
     for location in get_macos_image_locations():
         if location.exists():
             try:
-                for entry in os.scandir(location):
-                    if entry.is_file():
-                        ext = Path(entry.name).suffix.lower()
-                        if ext in IMAGE_EXTENSIONS:
+                with os.scandir(location) as it:
+                    for entry in it:
+                        if entry.is_file() and _is_image_name(entry.name):
                             count += 1
             except (PermissionError, OSError):
                 pass
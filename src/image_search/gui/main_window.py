@@ -1,22 +1,45 @@
 """
 Main application window
 """
+import os
+import time
 from pathlib import Path
 
-from PyQt6.QtCore import Qt, QThread, QTimer
+from PyQt6.QtCore import Qt, QThread, QThreadPool, QTimer
 from PyQt6.QtGui import QDragEnterEvent, QDropEvent, QKeySequence, QShortcut
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel,
     QPushButton, QLineEdit, QFrame, QStackedWidget, QProgressBar,
-    QFileDialog, QApplication, QMessageBox
+    QFileDialog, QMessageBox
 )
 
 from .theme import STYLESHEET, COLORS
 from .image_grid import ImageGrid
 from .image_preview import ImagePreviewDialog
 from .settings_panel import SettingsPanel
-from .workers import SearchWorker, IndexWorker, BrowseWorker
+from .workers import SearchWorker, IndexWorker, BrowseWorker, DropScanTask, EngineInitWorker, ModelPreloadWorker
 from .image_scanner import ImageScanner, get_macos_image_locations
+from .thumbnails import evict_old_thumbnails
+
+# One stylesheet for both tab buttons; the active one is picked out by :checked
+TAB_BUTTON_STYLE = f"""
+    QPushButton {{
+        background-color: transparent;
+        color: {COLORS['text_tertiary']};
+        border: none;
+        border-radius: 8px;
+        padding: 8px 16px;
+        font-size: 14px;
+        font-weight: 500;
+    }}
+    QPushButton:hover, QPushButton:checked {{
+        background-color: {COLORS['bg_tertiary']};
+        color: {COLORS['text_primary']};
+    }}
+"""
+
+# Extensions accepted from drag and drop
+IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png', '.webp', '.heic'})
 
 
 class MainWindow(QMainWindow):
@@ -31,6 +54,14 @@ class MainWindow(QMainWindow):
         self._index_thread = None
         self._scan_thread = None
         self._browse_thread = None
+        self._engine_thread = None
+        self._preload_thread = None
+        self._browse_pending = False
+        self._browse_shown = 0
+        self._browse_superseded = False  # search results replaced the running browse
+        self._pending_query = None
+        self._drop_scan = None
+        self._last_progress_update = 0.0
         self._is_first_launch = True
         
         self.setWindowTitle("Image Search")
@@ -48,6 +79,7 @@ class MainWindow(QMainWindow):
         
         # Initialize engine after UI is ready
         QTimer.singleShot(100, self._init_engine)
+        evict_old_thumbnails()
         
     def _setup_ui(self):
         central = QWidget()
@@ -68,10 +100,10 @@ class MainWindow(QMainWindow):
         self.search_view = self._create_search_view()
         self.stack.addWidget(self.search_view)
         
-        # Settings view
-        self.settings_panel = SettingsPanel(data_dir=self.base_dir)
-        self.settings_panel.faces_updated.connect(self._on_faces_updated)
-        self.stack.addWidget(self.settings_panel)
+        # Settings view: the app opens on Search, so the Faces panel (which reads and decodes
+        # every reference photo) is only built the first time its tab is opened
+        self.settings_panel = None
+        self.stack.addWidget(QWidget())
         
         main_layout.addWidget(self.stack, stretch=1)
         
@@ -175,25 +207,7 @@ class MainWindow(QMainWindow):
         btn = QPushButton(text)
         btn.setCheckable(True)
         btn.setChecked(active)
-        btn.setStyleSheet(f"""
-            QPushButton {{
-                background-color: {'%s' % COLORS['bg_tertiary'] if active else 'transparent'};
-                color: {'%s' % COLORS['text_primary'] if active else COLORS['text_tertiary']};
-                border: none;
-                border-radius: 8px;
-                padding: 8px 16px;
-                font-size: 14px;
-                font-weight: 500;
-            }}
-            QPushButton:hover {{
-                background-color: {COLORS['bg_tertiary']};
-                color: {COLORS['text_primary']};
-            }}
-            QPushButton:checked {{
-                background-color: {COLORS['bg_tertiary']};
-                color: {COLORS['text_primary']};
-            }}
-        """)
+        btn.setStyleSheet(TAB_BUTTON_STYLE)
         return btn
         
     def _create_search_view(self) -> QWidget:
@@ -259,78 +273,128 @@ class MainWindow(QMainWindow):
         add_images = QShortcut(QKeySequence("Ctrl+O"), self)
         add_images.activated.connect(self._add_images_dialog)
         
+    def _ensure_settings_panel(self):
+        if self.settings_panel is None:
+            placeholder = self.stack.widget(1)
+            self.settings_panel = SettingsPanel(data_dir=self.base_dir)
+            self.settings_panel.faces_updated.connect(self._on_faces_updated)
+            self.stack.insertWidget(1, self.settings_panel)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            
     def _switch_tab(self, index: int):
+        if index == 1:
+            self._ensure_settings_panel()
         self.stack.setCurrentIndex(index)
         self.search_tab.setChecked(index == 0)
-        self.settings_tab.setChecked(index == 1)
-        
-        # Update tab button styles
-        for i, btn in enumerate([self.search_tab, self.settings_tab]):
-            active = (i == index)
-            btn.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {'%s' % COLORS['bg_tertiary'] if active else 'transparent'};
-                    color: {'%s' % COLORS['text_primary'] if active else COLORS['text_tertiary']};
-                    border: none;
-                    border-radius: 8px;
-                    padding: 8px 16px;
-                    font-size: 14px;
-                    font-weight: 500;
-                }}
-                QPushButton:hover {{
-                    background-color: {COLORS['bg_tertiary']};
-                    color: {COLORS['text_primary']};
-                }}
-            """)
+        self.settings_tab.setChecked(index == 1)  # styled via :checked, no restyle needed
             
     def _init_engine(self):
         """Initialize search engine in background"""
         self.status_label.setText("Loading AI models...")
-        QApplication.processEvents()
         
-        try:
-            from image_search.core import SearchEngine
-            
-            self.engine = SearchEngine(data_dir=self.base_dir)
-            self.status_label.setText("Ready")
-            
-            # Load existing images
-            self._load_indexed_images()
-        except Exception as e:
-            self.status_label.setText(f"Error: {e}")
-            QMessageBox.warning(self, "Initialization Error", str(e))
+        self._engine_thread = QThread()
+        self._engine_worker = EngineInitWorker(self.base_dir)
+        self._engine_worker.moveToThread(self._engine_thread)
+        
+        self._engine_thread.started.connect(self._engine_worker.run)
+        self._engine_worker.finished.connect(self._on_engine_ready)
+        self._engine_worker.finished.connect(self._engine_thread.quit)
+        self._engine_worker.error.connect(self._on_engine_error)
+        self._engine_worker.error.connect(self._engine_thread.quit)
+        
+        self._engine_thread.start()
+        
+    def _on_engine_ready(self, engine):
+        self.engine = engine
+        self.status_label.setText("Ready")
+        
+        # Load the models now instead of stalling the first search on them
+        self._preload_thread = QThread()
+        self._preload_worker = ModelPreloadWorker(engine)
+        self._preload_worker.moveToThread(self._preload_thread)
+        
+        self._preload_thread.started.connect(self._preload_worker.run)
+        self._preload_worker.finished.connect(self._preload_thread.quit)
+        self._preload_worker.error.connect(self._on_preload_error)
+        self._preload_worker.error.connect(self._preload_thread.quit)
+        
+        self._preload_thread.start()
+        
+        # Load existing images
+        self._load_indexed_images()
+        
+    def _on_preload_error(self, message: str):
+        # Not fatal: the first search or index retries loading the models
+        print(f"[Preload Error] {message}")
+        
+    def _on_engine_error(self, message: str):
+        self.status_label.setText(f"Error: {message}")
+        QMessageBox.warning(self, "Initialization Error", message)
             
     def _load_indexed_images(self):
         """Load and display all indexed images"""
         if not self.engine:
             return
         
-        # Wait for any previous browse to finish
-        if self._browse_thread is not None and self._browse_thread.isRunning():
-            self._browse_thread.quit()
-            self._browse_thread.wait()
-            
         self.status_label.setText("Loading images...")
         
+        # A browse already running is left to finish; a new one starts after it
+        if self._browse_thread is not None:
+            self._browse_pending = True
+            return
+        self._start_browse()
+        
+    def _start_browse(self):
+        self._browse_pending = False
+        self._browse_shown = 0
+        self._browse_superseded = False
         self._browse_thread = QThread()
         self._browse_worker = BrowseWorker(self.engine)
         self._browse_worker.moveToThread(self._browse_thread)
         
         self._browse_thread.started.connect(self._browse_worker.run)
+        self._browse_worker.page.connect(self._on_browse_page)
         self._browse_worker.finished.connect(self._on_browse_complete)
         self._browse_worker.finished.connect(self._browse_thread.quit)
-        self._browse_worker.finished.connect(lambda: self._browse_thread.wait() if self._browse_thread else None)
         self._browse_worker.error.connect(lambda e: self.status_label.setText(f"Error: {e}"))
+        self._browse_worker.error.connect(self._browse_thread.quit)
+        self._browse_thread.finished.connect(self._on_browse_thread_finished)
         
         self._browse_thread.start()
         
-    def _on_browse_complete(self, results: list):
-        self.image_grid.display_indexed_images(results)
-        self.count_label.setText(f"{len(results)} images")
+    def _on_browse_thread_finished(self):
+        # finished is emitted just before the thread exits, so this wait returns at once
+        self._browse_thread.wait()
+        self._browse_thread = None
+        self._browse_worker = None
+        if self._browse_pending:
+            self._start_browse()
+        
+    def _on_browse_page(self, images: list):
+        # Stale if a newer browse is queued or search results now fill the grid
+        if self._browse_pending or self._browse_superseded:
+            return
+        # The first page replaces the grid; later ones extend it
+        if self._browse_shown == 0:
+            self.image_grid.display_indexed_images(images)
+        else:
+            self.image_grid.append_indexed_images(images)
+        self._browse_shown += len(images)
+        self.count_label.setText(f"{self._browse_shown} images")
+        
+    def _on_browse_complete(self, total: int):
+        if self._browse_superseded:
+            self._is_first_launch = False  # the user is already searching
+        if self._browse_pending or self._browse_superseded:
+            return
+        if total == 0:
+            self.image_grid.display_indexed_images([])
+        self.count_label.setText(f"{total} images")
         self.status_label.setText("Ready")
         
         # Auto-scan on first launch if no images indexed
-        if self._is_first_launch and len(results) == 0:
+        if self._is_first_launch and total == 0:
             self._is_first_launch = False
             self._prompt_auto_scan()
         else:
@@ -391,11 +455,14 @@ class MainWindow(QMainWindow):
             )
             return
             
+        skipped = self._scanner.skipped_unsupported
+        skipped_note = f" ({skipped} skipped, format not supported)" if skipped else ""
+        
         # Ask before indexing
         reply = QMessageBox.question(
             self,
             "Index Photos?",
-            f"Found {len(image_paths)} images.\n\n"
+            f"Found {len(image_paths)} images{skipped_note}.\n\n"
             f"Index them now? (This will take ~{len(image_paths) * 0.75 / 60:.0f} minutes)",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
             QMessageBox.StandardButton.Yes
@@ -409,13 +476,16 @@ class MainWindow(QMainWindow):
         if not query or not self.engine:
             return
         
-        # Wait for any previous search to finish
-        if self._search_thread is not None and self._search_thread.isRunning():
-            self._search_thread.quit()
-            self._search_thread.wait()
-            
         self.status_label.setText(f"Searching: {query}")
         
+        # A search already running is left to finish; the latest query runs after it
+        self._pending_query = query
+        if self._search_thread is None:
+            self._start_search()
+            
+    def _start_search(self):
+        query, self._pending_query = self._pending_query, None
+        
         # Run search in background thread
         self._search_thread = QThread()
         self._search_worker = SearchWorker(self.engine, query, limit=50)
@@ -424,17 +494,25 @@ class MainWindow(QMainWindow):
         self._search_thread.started.connect(self._search_worker.run)
         self._search_worker.finished.connect(self._on_search_complete)
         self._search_worker.finished.connect(self._search_thread.quit)
-        self._search_worker.finished.connect(self._cleanup_search_thread)
         self._search_worker.error.connect(lambda e: self.status_label.setText(f"Error: {e}"))
+        self._search_worker.error.connect(self._search_thread.quit)
+        self._search_thread.finished.connect(self._on_search_thread_finished)
         
         self._search_thread.start()
         
-    def _cleanup_search_thread(self):
-        """Clean up search thread after completion"""
-        if self._search_thread is not None:
-            self._search_thread.wait()
+    def _on_search_thread_finished(self):
+        # finished is emitted just before the thread exits, so this wait returns at once
+        self._search_thread.wait()
+        self._search_thread = None
+        self._search_worker = None
+        if self._pending_query is not None:
+            self._start_search()
         
     def _on_search_complete(self, results: list):
+        if self._pending_query is not None:
+            return  # stale; a newer query is queued
+        if self._browse_thread is not None:
+            self._browse_superseded = True  # its remaining pages mustn't mix into these results
         self.image_grid.display_results(results)
         self.count_label.setText(f"{len(results)} results")
         self.status_label.setText("Ready")
@@ -464,7 +542,8 @@ class MainWindow(QMainWindow):
     def _index_images(self, paths: list):
         """Index images in background"""
         self.status_label.setText("Indexing images...")
-        self.progress_bar.setMaximum(len(paths))
+        # Indeterminate until the worker reports how many paths are actually new
+        self.progress_bar.setMaximum(0)
         self.progress_bar.setValue(0)
         self.progress_bar.show()
         
@@ -481,8 +560,17 @@ class MainWindow(QMainWindow):
         self._index_thread.start()
         
     def _on_index_progress(self, current: int, total: int, path: str):
+        if self.progress_bar.maximum() != total:
+            self.progress_bar.setMaximum(total)
+            
+        # Repaint at most ~30 times a second however fast images are indexed
+        now = time.monotonic()
+        if current < total and now - self._last_progress_update < 0.033:
+            return
+        self._last_progress_update = now
+        
         self.progress_bar.setValue(current)
-        name = Path(path).name
+        name = os.path.basename(path)
         self.status_label.setText(f"Indexing {current}/{total}: {name}")
         
     def _on_index_complete(self, count: int):
@@ -508,23 +596,25 @@ class MainWindow(QMainWindow):
             for url in event.mimeData().urls():
                 if url.isLocalFile():
                     path = url.toLocalFile()
-                    if path.lower().endswith(('.jpg', '.jpeg', '.png', '.webp', '.heic')):
+                    if os.path.splitext(path)[1].lower() in IMAGE_EXTS or os.path.isdir(path):
                         event.acceptProposedAction()
                         return
                         
     def dropEvent(self, event: QDropEvent):
-        image_paths = []
-        for url in event.mimeData().urls():
-            if url.isLocalFile():
-                path = url.toLocalFile()
-                if path.lower().endswith(('.jpg', '.jpeg', '.png', '.webp', '.heic')):
-                    image_paths.append(path)
-                elif Path(path).is_dir():
-                    # Add all images from directory
-                    for f in Path(path).rglob("*"):
-                        if f.suffix.lower() in ('.jpg', '.jpeg', '.png', '.webp', '.heic'):
-                            image_paths.append(str(f))
-                            
+        paths = [url.toLocalFile() for url in event.mimeData().urls() if url.isLocalFile()]
+        if not paths:
+            return
+        event.acceptProposedAction()
+        
+        # Walking a dropped folder can take a while, so it happens on the thread pool
+        self.status_label.setText("Collecting dropped images...")
+        self._drop_scan = DropScanTask(paths, IMAGE_EXTS)
+        self._drop_scan.signals.finished.connect(self._on_drop_scanned)
+        QThreadPool.globalInstance().start(self._drop_scan)
+        
+    def _on_drop_scanned(self, image_paths: list):
+        self._drop_scan = None
         if image_paths:
             self._index_images(image_paths)
-
+        else:
+            self.status_label.setText("No images in drop")
@@ -3,6 +3,8 @@ Settings panel for face management and preferences
 """
 import os
 import shutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from PyQt6.QtCore import Qt, pyqtSignal
@@ -14,6 +16,9 @@ from PyQt6.QtWidgets import (
 )
 
 from .theme import COLORS
+from .thumbnails import read_scaled
+
+FACE_IMAGE_EXTS = frozenset({'.jpg', '.jpeg', '.png'})
 
 
 class FaceCard(QFrame):
@@ -21,18 +26,18 @@ class FaceCard(QFrame):
     
     delete_clicked = pyqtSignal(str)  # person name
     
+    THUMB_CACHE_SIZE = 256
+    _thumb_cache = OrderedDict()  # image path -> rounded QPixmap, shared by all cards
+    _clip_path = QPainterPath()
+    _clip_path.addEllipse(0, 0, 48, 48)
+    
     def __init__(self, name: str, image_paths: list, parent=None):
         super().__init__(parent)
         self.name = name
         self.image_paths = image_paths
         
-        self.setStyleSheet(f"""
-            QFrame {{
-                background-color: {COLORS['bg_secondary']};
-                border-radius: 12px;
-                border: 1px solid {COLORS['separator']};
-            }}
-        """)
+        # Styled by the faceCard rules in the theme, so each card skips parsing its own sheet
+        self.setObjectName("faceCard")
         
         self._setup_ui()
         
@@ -58,18 +63,11 @@ class FaceCard(QFrame):
         info_layout.setSpacing(4)
         
         name_label = QLabel(self.name)
-        name_label.setStyleSheet(f"""
-            font-size: 16px;
-            font-weight: 600;
-            color: {COLORS['text_primary']};
-        """)
+        name_label.setObjectName("faceName")
         info_layout.addWidget(name_label)
         
         count_label = QLabel(f"{len(self.image_paths)} reference photo(s)")
-        count_label.setStyleSheet(f"""
-            font-size: 12px;
-            color: {COLORS['text_tertiary']};
-        """)
+        count_label.setObjectName("faceCount")
         info_layout.addWidget(count_label)
         
         layout.addLayout(info_layout, stretch=1)
@@ -78,17 +76,6 @@ class FaceCard(QFrame):
         delete_btn = QPushButton("🗑")
         delete_btn.setFixedSize(36, 36)
         delete_btn.setObjectName("iconBtn")
-        delete_btn.setStyleSheet(f"""
-            QPushButton {{
-                font-size: 16px;
-                background-color: transparent;
-                border: none;
-                border-radius: 6px;
-            }}
-            QPushButton:hover {{
-                background-color: {COLORS['error']};
-            }}
-        """)
         delete_btn.clicked.connect(lambda: self.delete_clicked.emit(self.name))
         layout.addWidget(delete_btn)
         
@@ -96,32 +83,41 @@ class FaceCard(QFrame):
         label = QLabel()
         label.setFixedSize(48, 48)
         
-        pixmap = QPixmap(image_path)
-        if not pixmap.isNull():
+        cached = self._thumb_cache.get(image_path)
+        if cached is not None:
+            self._thumb_cache.move_to_end(image_path)
+            label.setPixmap(cached)
+            return label
+        
+        # Decode at ~2x the thumbnail instead of the full-resolution photo, and
+        # crop/scale as a QImage so only the final 48px image becomes a pixmap
+        image = read_scaled(image_path, 96)
+        if not image.isNull():
             # Scale and crop to square
-            size = min(pixmap.width(), pixmap.height())
-            cropped = pixmap.copy(
-                (pixmap.width() - size) // 2,
-                (pixmap.height() - size) // 2,
+            size = min(image.width(), image.height())
+            cropped = image.copy(
+                (image.width() - size) // 2,
+                (image.height() - size) // 2,
                 size, size
             )
-            scaled = cropped.scaled(
+            scaled = QPixmap.fromImage(cropped.scaled(
                 48, 48,
-                Qt.AspectRatioMode.KeepAspectRatio,
+                Qt.AspectRatioMode.IgnoreAspectRatio,  # already square
                 Qt.TransformationMode.SmoothTransformation
-            )
+            ))
             
-            # Round corners
+            # Clip to a circle
             rounded = QPixmap(48, 48)
             rounded.fill(Qt.GlobalColor.transparent)
             painter = QPainter(rounded)
             painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-            path = QPainterPath()
-            path.addRoundedRect(0, 0, 48, 48, 24, 24)  # Circular
-            painter.setClipPath(path)
+            painter.setClipPath(self._clip_path)
             painter.drawPixmap(0, 0, scaled)
             painter.end()
             
+            self._thumb_cache[image_path] = rounded
+            if len(self._thumb_cache) > self.THUMB_CACHE_SIZE:
+                self._thumb_cache.popitem(last=False)
             label.setPixmap(rounded)
         else:
             label.setStyleSheet(f"""
@@ -143,6 +139,7 @@ class SettingsPanel(QWidget):
         super().__init__(parent)
         self.data_dir = data_dir
         self.known_faces_dir = data_dir / "known_faces"
+        self._face_cards = {}  # person -> (dir mtime_ns, FaceCard)
         
         self._setup_ui()
         self._load_faces()
@@ -178,12 +175,7 @@ class SettingsPanel(QWidget):
         self.scroll.setWidgetResizable(True)
         self.scroll.setStyleSheet("background-color: transparent; border: none;")
         
-        self.face_container = QWidget()
-        self.face_layout = QVBoxLayout(self.face_container)
-        self.face_layout.setContentsMargins(0, 0, 0, 0)
-        self.face_layout.setSpacing(12)
-        self.face_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
-        
+        self.face_container, self.face_layout = self._new_face_container()
         self.scroll.setWidget(self.face_container)
         layout.addWidget(self.scroll, stretch=1)
         
@@ -197,38 +189,73 @@ class SettingsPanel(QWidget):
         """)
         self.face_layout.addWidget(self.empty_label)
         
+    @staticmethod
+    def _new_face_container():
+        container = QWidget()
+        face_layout = QVBoxLayout(container)
+        face_layout.setContentsMargins(0, 0, 0, 0)
+        face_layout.setSpacing(12)
+        face_layout.setAlignment(Qt.AlignmentFlag.AlignTop)
+        return container, face_layout
+        
     def _load_faces(self):
-        """Load existing known faces"""
-        # Clear existing cards
-        for i in reversed(range(self.face_layout.count())):
-            widget = self.face_layout.itemAt(i).widget()
-            if widget and widget != self.empty_label:
-                widget.deleteLater()
-                
-        if not self.known_faces_dir.exists():
-            self.empty_label.show()
-            return
+        """Load existing known faces, rebuilding cards only for people whose folder changed"""
+        try:
+            with os.scandir(self.known_faces_dir) as it:
+                person_dirs = sorted(
+                    (e for e in it if e.is_dir(follow_symlinks=False)),
+                    key=lambda e: e.name
+                )
+        except OSError:
+            person_dirs = []
             
-        has_faces = False
-        for person_dir in sorted(self.known_faces_dir.iterdir()):
-            if not person_dir.is_dir():
+        # Cards are laid out in a fresh container that replaces the old one in a
+        # single step; stale cards left behind are deleted along with it
+        container, face_layout = self._new_face_container()
+        container.setUpdatesEnabled(False)
+        face_layout.addWidget(self.empty_label)
+        
+        cards = {}
+        for person_dir in person_dirs:
+            name = person_dir.name
+            try:
+                mtime = person_dir.stat().st_mtime_ns
+            except OSError:
                 continue
                 
-            # Get image paths for this person
-            images = [
-                str(person_dir / f) 
-                for f in os.listdir(person_dir)
-                if f.lower().endswith(('.jpg', '.jpeg', '.png'))
-            ]
-            
-            if images:
-                has_faces = True
-                card = FaceCard(person_dir.name, images)
+            cached = self._face_cards.get(name)
+            if cached is not None and cached[0] == mtime:
+                card = cached[1]
+            else:
+                # Get image paths for this person
+                images = self._person_images(person_dir.path)
+                if not images:
+                    continue
+                card = FaceCard(name, images)
                 card.delete_clicked.connect(self._delete_person)
-                self.face_layout.addWidget(card)
                 
-        self.empty_label.setVisible(not has_faces)
+            cards[name] = (mtime, card)
+            face_layout.addWidget(card)
+            
+        self._face_cards = cards
+        self.empty_label.setVisible(not cards)
         
+        self.scroll.setWidget(container)  # deletes the previous container
+        self.face_container, self.face_layout = container, face_layout
+        container.setUpdatesEnabled(True)
+        
+    @staticmethod
+    def _person_images(person_dir: str) -> list:
+        try:
+            with os.scandir(person_dir) as it:
+                return [
+                    e.path for e in it
+                    if os.path.splitext(e.name)[1].lower() in FACE_IMAGE_EXTS
+                    and e.is_file(follow_symlinks=False)
+                ]
+        except OSError:
+            return []
+            
     def _add_person(self):
         """Add a new person with reference photos"""
         name, ok = QInputDialog.getText(
@@ -262,9 +289,11 @@ class SettingsPanel(QWidget):
             
         # Create directory and copy photos
         person_dir.mkdir(parents=True, exist_ok=True)
-        for src in files:
-            dst = person_dir / Path(src).name
-            shutil.copy2(src, dst)
+        # copy2 already uses the OS fast-copy path; overlapping the copies hides IO latency
+        with ThreadPoolExecutor(max_workers=min(len(files), 4)) as executor:
+            list(executor.map(
+                lambda src: shutil.copy2(src, person_dir / os.path.basename(src)), files
+            ))
             
         self._load_faces()
         self.faces_updated.emit()
@@ -282,20 +311,7 @@ class SettingsPanel(QWidget):
             if person_dir.exists():
                 shutil.rmtree(person_dir)
                 
-            # Also remove from DB cache
-            db_path = self.known_faces_dir / "known_faces_db.pkl"
-            if db_path.exists():
-                import pickle
-                try:
-                    with open(db_path, "rb") as f:
-                        db = pickle.load(f)
-                    if name in db:
-                        del db[name]
-                    with open(db_path, "wb") as f:
-                        pickle.dump(db, f)
-                except Exception:
-                    pass
-                    
+            # FaceIdentifier drops people whose folder is gone on its next scan
             self._load_faces()
             self.faces_updated.emit()
 
@@ -20,44 +20,45 @@ COLORS = {
     "overlay": "rgba(0, 0, 0, 0.6)",
 }
 
-STYLESHEET = f"""
+# Placeholders name COLORS keys; braces that belong to the CSS are doubled
+_TEMPLATE = """
 * {{
     font-family: ".AppleSystemUIFont", "Helvetica Neue", sans-serif;
 }}
 
 QMainWindow {{
-    background-color: {COLORS['bg_primary']};
+    background-color: {bg_primary};
 }}
 
 QWidget {{
     background-color: transparent;
-    color: {COLORS['text_primary']};
+    color: {text_primary};
 }}
 
 /* Search Bar */
 QLineEdit#searchBar {{
-    background-color: {COLORS['bg_secondary']};
-    border: 1px solid {COLORS['separator']};
+    background-color: {bg_secondary};
+    border: 1px solid {separator};
     border-radius: 12px;
     padding: 14px 20px 14px 48px;
     font-size: 17px;
     font-weight: 400;
-    color: {COLORS['text_primary']};
-    selection-background-color: {COLORS['accent']};
+    color: {text_primary};
+    selection-background-color: {accent};
 }}
 
 QLineEdit#searchBar:focus {{
-    border: 2px solid {COLORS['accent']};
-    background-color: {COLORS['bg_tertiary']};
+    border: 2px solid {accent};
+    background-color: {bg_tertiary};
 }}
 
 QLineEdit#searchBar::placeholder {{
-    color: {COLORS['text_tertiary']};
+    color: {text_tertiary};
 }}
 
 /* Buttons */
 QPushButton {{
-    background-color: {COLORS['accent']};
+    background-color: {accent};
     color: white;
     border: none;
     border-radius: 8px;
@@ -67,20 +68,20 @@ QPushButton {{
 }}
 
 QPushButton:hover {{
-    background-color: {COLORS['accent_hover']};
+    background-color: {accent_hover};
 }}
 
 QPushButton:pressed {{
-    background-color: {COLORS['accent_pressed']};
+    background-color: {accent_pressed};
 }}
 
 QPushButton#secondaryBtn {{
-    background-color: {COLORS['bg_tertiary']};
-    color: {COLORS['text_primary']};
+    background-color: {bg_tertiary};
+    color: {text_primary};
 }}
 
 QPushButton#secondaryBtn:hover {{
-    background-color: {COLORS['bg_elevated']};
+    background-color: {bg_elevated};
 }}
 
 QPushButton#iconBtn {{
@@ -90,7 +91,7 @@ QPushButton#iconBtn {{
 }}
 
 QPushButton#iconBtn:hover {{
-    background-color: {COLORS['bg_tertiary']};
+    background-color: {bg_tertiary};
 }}
 
 /* Scroll Area */
@@ -106,13 +107,13 @@ QScrollBar:vertical {{
 }}
 
 QScrollBar::handle:vertical {{
-    background-color: {COLORS['bg_elevated']};
+    background-color: {bg_elevated};
     border-radius: 4px;
     min-height: 40px;
 }}
 
 QScrollBar::handle:vertical:hover {{
-    background-color: {COLORS['text_tertiary']};
+    background-color: {text_tertiary};
 }}
 
 QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {{
@@ -125,60 +126,94 @@ QScrollBar:horizontal {{
 }}
 
 QScrollBar::handle:horizontal {{
-    background-color: {COLORS['bg_elevated']};
+    background-color: {bg_elevated};
     border-radius: 4px;
 }}
 
 /* Labels */
 QLabel {{
-    color: {COLORS['text_primary']};
+    color: {text_primary};
 }}
 
 QLabel#sectionTitle {{
     font-size: 22px;
     font-weight: 700;
-    color: {COLORS['text_primary']};
+    color: {text_primary};
 }}
 
 QLabel#subtitle {{
     font-size: 13px;
-    color: {COLORS['text_tertiary']};
+    color: {text_tertiary};
 }}
 
 QLabel#statusLabel {{
     font-size: 12px;
-    color: {COLORS['text_secondary']};
+    color: {text_secondary};
     padding: 4px 8px;
-    background-color: {COLORS['bg_secondary']};
+    background-color: {bg_secondary};
     border-radius: 6px;
 }}
 
 /* Frame */
 QFrame#card {{
-    background-color: {COLORS['bg_secondary']};
+    background-color: {bg_secondary};
     border-radius: 12px;
-    border: 1px solid {COLORS['separator']};
+    border: 1px solid {separator};
 }}
 
 QFrame#imageCard {{
-    background-color: {COLORS['bg_secondary']};
-    border-radius: 8px;
+    background-color: {bg_secondary};
+    border-radius: 10px;
     border: none;
 }}
 
 QFrame#imageCard:hover {{
-    background-color: {COLORS['bg_tertiary']};
+    background-color: {bg_tertiary};
+}}
+
+QLabel#cardThumbnail {{
+    background-color: {bg_tertiary};
+    border-radius: 8px;
+}}
+
+/* Known-face cards (settings panel) */
+QFrame#faceCard, QFrame#faceCard QFrame {{
+    background-color: {bg_secondary};
+    border-radius: 12px;
+    border: 1px solid {separator};
+}}
+
+QLabel#faceName {{
+    font-size: 16px;
+    font-weight: 600;
+    color: {text_primary};
+}}
+
+QLabel#faceCount {{
+    font-size: 12px;
+    color: {text_tertiary};
+}}
+
+QFrame#faceCard QPushButton#iconBtn {{
+    font-size: 16px;
+    background-color: transparent;
+    border: none;
+    border-radius: 6px;
+}}
+
+QFrame#faceCard QPushButton#iconBtn:hover {{
+    background-color: {error};
 }}
 
 /* Tab Widget */
 QTabWidget::pane {{
     border: none;
-    background-color: {COLORS['bg_primary']};
+    background-color: {bg_primary};
 }}
 
 QTabBar::tab {{
     background-color: transparent;
-    color: {COLORS['text_tertiary']};
+    color: {text_tertiary};
     padding: 10px 20px;
     font-size: 14px;
     font-weight: 500;
@@ -187,31 +222,31 @@ QTabBar::tab {{
 }}
 
 QTabBar::tab:selected {{
-    color: {COLORS['accent']};
-    border-bottom: 2px solid {COLORS['accent']};
+    color: {accent};
+    border-bottom: 2px solid {accent};
 }}
 
 QTabBar::tab:hover {{
-    color: {COLORS['text_primary']};
+    color: {text_primary};
 }}
 
 /* Progress Bar */
 QProgressBar {{
-    background-color: {COLORS['bg_tertiary']};
+    background-color: {bg_tertiary};
     border-radius: 4px;
     height: 6px;
     text-align: center;
 }}
 
 QProgressBar::chunk {{
-    background-color: {COLORS['accent']};
+    background-color: {accent};
     border-radius: 4px;
 }}
 
 /* Menu */
 QMenu {{
-    background-color: {COLORS['bg_secondary']};
-    border: 1px solid {COLORS['separator']};
+    background-color: {bg_secondary};
+    border: 1px solid {separator};
     border-radius: 8px;
     padding: 4px;
 }}
@@ -222,24 +257,24 @@ QMenu::item {{
 }}
 
 QMenu::item:selected {{
-    background-color: {COLORS['accent']};
+    background-color: {accent};
 }}
 
 /* Dialog */
 QDialog {{
-    background-color: {COLORS['bg_primary']};
+    background-color: {bg_primary};
 }}
 
 /* Splitter */
 QSplitter::handle {{
-    background-color: {COLORS['separator']};
+    background-color: {separator};
 }}
 
 /* Tool Tip */
 QToolTip {{
-    background-color: {COLORS['bg_elevated']};
-    color: {COLORS['text_primary']};
-    border: 1px solid {COLORS['separator']};
+    background-color: {bg_elevated};
+    color: {text_primary};
+    border: 1px solid {separator};
     border-radius: 6px;
     padding: 6px 10px;
     font-size: 12px;
@@ -247,8 +282,8 @@ QToolTip {{
 
 /* List Widget */
 QListWidget {{
-    background-color: {COLORS['bg_secondary']};
-    border: 1px solid {COLORS['separator']};
+    background-color: {bg_secondary};
+    border: 1px solid {separator};
     border-radius: 8px;
     padding: 4px;
 }}
@@ -259,11 +294,12 @@ QListWidget::item {{
 }}
 
 QListWidget::item:selected {{
-    background-color: {COLORS['accent']};
+    background-color: {accent};
 }}
 
 QListWidget::item:hover {{
-    background-color: {COLORS['bg_tertiary']};
+    background-color: {bg_tertiary};
 }}
 """
 
+STYLESHEET = _TEMPLATE.format_map(COLORS)
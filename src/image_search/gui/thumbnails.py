@@ -0,0 +1,244 @@
+"""
+Grid thumbnail rendering: scaled decode, on-disk cache, background tasks
+"""
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, pyqtSignal
+from PyQt6.QtGui import QImage, QImageIOHandler, QImageReader, QPainter
+
+THUMB_CACHE_DIR = Path.home() / ".cache" / "image_search" / "thumbs"
+THUMB_MAX_AGE_DAYS = 30
+THUMB_VERSION = 2  # bump when rendering changes so old cache files are ignored
+
+
+def read_scaled(image_path: str, min_side: int) -> QImage:
+    """
+    Decode image_path with its short side scaled down to about min_side.
+    The reader scales during decode (DCT scaling for JPEG), so a 40 MP
+    photo is never fully decoded just to become a thumbnail.
+    """
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)  # honour EXIF orientation
+    size = reader.size()
+    short = min(size.width(), size.height())
+    if size.isValid() and short > min_side:
+        factor = min_side / short
+        reader.setScaledSize(QSize(
+            max(1, round(size.width() * factor)),
+            max(1, round(size.height() * factor)),
+        ))
+    return reader.read()
+
+
+def read_fitted(image_path: str, width: int, height: int) -> QImage:
+    """Decode image_path scaled to fit width x height, keeping its aspect ratio"""
+    reader = QImageReader(image_path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid():
+        # The scaled size applies before EXIF rotation, which may swap the sides
+        rotated = bool(reader.transformation() & QImageIOHandler.Transformation.TransformationRotate90)
+        if rotated:
+            width, height = height, width
+        reader.setScaledSize(size.scaled(width, height, Qt.AspectRatioMode.KeepAspectRatio))
+    return reader.read()
+
+
+def thumb_key(image_path: str, size: int) -> str | None:
+    """Cache key for image_path at size; changes when the source's mtime or size does"""
+    try:
+        st = os.stat(image_path)
+    except OSError:
+        return None
+    digest = hashlib.sha1(image_path.encode()).hexdigest()
+    return f"{digest}_{int(st.st_mtime)}_{st.st_size}_{size}_v{THUMB_VERSION}"
+
+
+def thumb_cache_path(image_path: str, size: int) -> Path | None:
+    """On-disk cache file for image_path at size"""
+    key = thumb_key(image_path, size)
+    return None if key is None else THUMB_CACHE_DIR / f"{key}.png"
+
+
+def render_thumbnail(image_path: str, size: int, radius: int = 8, on_preview=None) -> QImage:
+    """
+    Square, rounded-corner thumbnail of image_path, from the disk cache when possible.
+    Only uses QImage/QPainter, so it is safe to call off the GUI thread.
+    Returns a null QImage if the file can't be read.
+
+    On a cache miss, on_preview (if given) is first called with a quick
+    nearest-neighbour version; returning False from it skips the smooth
+    pass, and a null QImage is returned.
+    """
+    cache_path = thumb_cache_path(image_path, size)
+    if cache_path is not None and cache_path.exists():
+        cached = QImage(str(cache_path))
+        if not cached.isNull():
+            return cached
+
+    # Decode at 2x the target so the smooth crop/scale below keeps detail
+    image = read_scaled(image_path, 2 * size)
+    if image.isNull():
+        return image
+
+    # Crop to square from center
+    w, h = image.width(), image.height()
+    if w > h:
+        image = image.copy((w - h) // 2, 0, h, h)
+    elif h > w:
+        image = image.copy(0, (h - w) // 2, w, w)
+
+    if on_preview is not None:
+        preview = _rounded(image, size, radius, Qt.TransformationMode.FastTransformation)
+        if on_preview(preview) is False:
+            return QImage()
+
+    rounded = _rounded(image, size, radius, Qt.TransformationMode.SmoothTransformation)
+    if cache_path is not None:
+        _write_thumbnail(rounded, cache_path)
+    return rounded
+
+
+_round_masks = {}  # (size, radius) -> QImage, shared by every thumbnail
+
+
+def _round_mask(size: int, radius: int) -> QImage:
+    """Antialiased rounded-rect alpha mask, rasterised once per size"""
+    mask = _round_masks.get((size, radius))
+    if mask is None:
+        mask = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+        mask.fill(Qt.GlobalColor.transparent)
+        painter = QPainter(mask)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(Qt.GlobalColor.white)
+        painter.drawRoundedRect(0, 0, size, size, radius, radius)
+        painter.end()
+        mask = _round_masks.setdefault((size, radius), mask)
+    return mask
+
+
+def _rounded(image: QImage, size: int, radius: int, mode: Qt.TransformationMode) -> QImage:
+    scaled = image.scaled(
+        size, size,
+        Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+        mode
+    )
+
+    # Create rounded corners by keeping only what lies under the shared mask
+    rounded = QImage(size, size, QImage.Format.Format_ARGB32_Premultiplied)
+    rounded.fill(Qt.GlobalColor.transparent)
+
+    painter = QPainter(rounded)
+    painter.drawImage(0, 0, scaled)
+    painter.setCompositionMode(QPainter.CompositionMode.CompositionMode_DestinationIn)
+    painter.drawImage(0, 0, _round_mask(size, radius))
+    painter.end()
+    return rounded
+
+
+class ThumbnailSignals(QObject):
+    preview = pyqtSignal(QImage)  # fast first pass, only on a cache miss
+    ready = pyqtSignal(QImage)
+
+
+class ThumbnailTask(QRunnable):
+    """Render one thumbnail on the thread pool and deliver it through signals.ready"""
+
+    def __init__(self, image_path: str, size: int):
+        super().__init__()
+        self.image_path = image_path
+        self.size = size
+        self.signals = ThumbnailSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        """Skip the work if not started yet, and drop the result if it is"""
+        self._cancelled = True
+
+    def run(self):
+        if self._cancelled:
+            return
+        image = render_thumbnail(self.image_path, self.size, on_preview=self._preview)
+        if not self._cancelled:
+            self.signals.ready.emit(image)
+
+    def _preview(self, image: QImage) -> bool:
+        if self._cancelled:
+            return False  # card went away; don't bother with the smooth pass
+        self.signals.preview.emit(image)
+        return True
+
+
+class PreviewTask(QRunnable):
+    """Decode an image to fit a preview area on the thread pool; delivered through signals.ready"""
+
+    def __init__(self, image_path: str, width: int, height: int):
+        super().__init__()
+        self.image_path = image_path
+        self.width = width
+        self.height = height
+        self.signals = ThumbnailSignals()
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        if self._cancelled:
+            return
+        image = read_fitted(self.image_path, self.width, self.height)
+        if not self._cancelled:
+            self.signals.ready.emit(image)
+
+
+def start_preview(image_path: str, width: int, height: int) -> PreviewTask:
+    """Queue a PreviewTask ahead of any pending grid thumbnails"""
+    task = PreviewTask(image_path, width, height)
+    QThreadPool.globalInstance().start(task, 100)
+    return task
+
+
+def start_thumbnail(image_path: str, size: int, priority: int = 0) -> ThumbnailTask:
+    """Queue a ThumbnailTask; queued tasks with higher priority are started first"""
+    task = ThumbnailTask(image_path, size)
+    QThreadPool.globalInstance().start(task, priority)
+    return task
+
+
+def _write_thumbnail(image: QImage, cache_path: Path):
+    """Write via a temp file so a concurrent reader never sees a partial PNG"""
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp.png")
+        if image.save(str(tmp_path), "PNG"):
+            os.replace(tmp_path, cache_path)
+    except OSError:
+        pass
+
+
+class _EvictThumbnails(QRunnable):
+    def __init__(self, max_age_days: int):
+        super().__init__()
+        self.max_age_days = max_age_days
+
+    def run(self):
+        cutoff = time.time() - self.max_age_days * 86400
+        try:
+            with os.scandir(THUMB_CACHE_DIR) as it:
+                for entry in it:
+                    try:
+                        if entry.stat().st_mtime < cutoff:
+                            os.unlink(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+
+def evict_old_thumbnails(max_age_days: int = THUMB_MAX_AGE_DAYS):
+    """Delete cached thumbnails older than max_age_days, in the background"""
+    QThreadPool.globalInstance().start(_EvictThumbnails(max_age_days))
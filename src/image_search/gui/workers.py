@@ -1,10 +1,50 @@
 """
 Background worker threads for non-blocking operations
 """
+import os
 from pathlib import Path
 from typing import List
 
-from PyQt6.QtCore import QObject, pyqtSignal
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+
+class EngineInitWorker(QObject):
+    """Worker for importing and constructing the SearchEngine in background"""
+    
+    finished = pyqtSignal(object)  # SearchEngine
+    error = pyqtSignal(str)
+    
+    def __init__(self, data_dir: Path):
+        super().__init__()
+        self.data_dir = data_dir
+        
+    def run(self):
+        try:
+            from image_search.core import SearchEngine
+            
+            self.finished.emit(SearchEngine(data_dir=self.data_dir))
+        except Exception as e:
+            self.error.emit(str(e))
+
+
+class ModelPreloadWorker(QObject):
+    """Worker for loading the engine's ML models before the first search or index needs them"""
+    
+    finished = pyqtSignal()
+    error = pyqtSignal(str)
+    
+    def __init__(self, engine):
+        super().__init__()
+        self.engine = engine
+        
+    def run(self):
+        try:
+            # Workers that reach _init_embedder meanwhile block on its lock
+            # until this load finishes, rather than loading the models again
+            self.engine._init_embedder()
+            self.finished.emit()
+        except Exception as e:
+            self.error.emit(str(e))
 
 
 class SearchWorker(QObject):
@@ -34,29 +74,36 @@ class IndexWorker(QObject):
     finished = pyqtSignal(int)  # count indexed
     error = pyqtSignal(str)
     
-    def __init__(self, engine, image_paths: List[str]):
+    def __init__(self, engine, image_paths: List[str], batch_size: int = 16):
         super().__init__()
         self.engine = engine
         self.image_paths = image_paths
+        self.batch_size = batch_size
         self._cancelled = False
         
     def run(self):
         try:
             indexed = 0
+            # Drop already-indexed paths up front so every batch is full of new work
+            self.image_paths = self.engine.filter_new_paths(self.image_paths)
             total = len(self.image_paths)
             
-            for i, path in enumerate(self.image_paths):
+            # One batched CLIP pass and one upsert per batch instead of per image
+            for start in range(0, total, self.batch_size):
                 if self._cancelled:
                     break
                     
-                self.progress.emit(i + 1, total, path)
-                
+                batch = self.image_paths[start:start + self.batch_size]
                 try:
-                    self.engine.add_image(path)
-                    indexed += 1
+                    results = self.engine.add_images_batch(batch)
+                    # False means already indexed; per-image failures were reported by the embedder
+                    indexed += sum(result is True for result in results)
                 except Exception as e:
-                    print(f"Failed to index {path}: {e}")
+                    print(f"Failed to index batch starting at {batch[0]}: {e}")
                     
+                # Reported once the batch is done, so the last one reaches total
+                self.progress.emit(start + len(batch), total, batch[-1])
+                        
             self.finished.emit(indexed)
         except Exception as e:
             self.error.emit(str(e))
@@ -66,19 +113,52 @@ class IndexWorker(QObject):
 
 
 class BrowseWorker(QObject):
-    """Worker for loading all indexed images"""
+    """Worker for loading all indexed images, delivered a page at a time"""
     
-    finished = pyqtSignal(list)
+    page = pyqtSignal(list)  # [(path, metadata), ...]
+    finished = pyqtSignal(int)  # total images found
     error = pyqtSignal(str)
     
-    def __init__(self, engine):
+    PAGE_SIZE = 100
+    
+    def __init__(self, engine, limit: int = 1000):
         super().__init__()
         self.engine = engine
+        self.limit = limit
         
     def run(self):
         try:
-            results = self.engine.get_all_images(limit=1000)
-            self.finished.emit(results)
+            total = 0
+            for images in self.engine.iter_all_images(page_size=self.PAGE_SIZE, limit=self.limit):
+                total += len(images)
+                self.page.emit(images)
+            self.finished.emit(total)
         except Exception as e:
             self.error.emit(str(e))
 
+
+class DropScanSignals(QObject):
+    finished = pyqtSignal(list)  # image paths
+
+
+class DropScanTask(QRunnable):
+    """Collect image files from dropped files/folders on the thread pool"""
+    
+    def __init__(self, paths: List[str], extensions: frozenset):
+        super().__init__()
+        self.paths = paths
+        self.extensions = extensions
+        self.signals = DropScanSignals()
+        
+    def run(self):
+        image_paths = []
+        for path in self.paths:
+            if os.path.splitext(path)[1].lower() in self.extensions:
+                image_paths.append(path)
+            elif os.path.isdir(path):
+                # Add all images from directory
+                for root, _, files in os.walk(path):
+                    for f in files:
+                        if f[f.rfind('.'):].lower() in self.extensions:
+                            image_paths.append(os.path.join(root, f))
+        self.signals.finished.emit(image_paths)
@@ -0,0 +1,63 @@
+"""
+Tests for the OCR text pre-filter
+"""
+import sys
+import types
+
+import pytest
+
+pytest.importorskip("cv2")
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from image_search.core.ocr import OCR, _likely_has_text  # noqa: E402
+
+
+def _text_image(text: str, font_size: int) -> Image.Image:
+    img = Image.new("RGB", (1200, 800), "white")
+    ImageDraw.Draw(img).text((50, 250), text, fill="black", font=ImageFont.load_default(size=font_size))
+    return img
+
+
+@pytest.fixture
+def fake_ocrmac(monkeypatch):
+    """Stand-in for ocrmac (macOS only) that records the images it is asked to read"""
+    seen = []
+
+    class FakeOCR:
+        def __init__(self, img):
+            seen.append(img)
+
+        def recognize(self):
+            return [("EXIT", 0.99, (0, 0, 1, 1))]
+
+    ocrmac = types.ModuleType("ocrmac")
+    ocrmac.ocrmac = types.ModuleType("ocrmac.ocrmac")
+    ocrmac.ocrmac.OCR = FakeOCR
+    monkeypatch.setitem(sys.modules, "ocrmac", ocrmac)
+    monkeypatch.setitem(sys.modules, "ocrmac.ocrmac", ocrmac.ocrmac)
+    return seen
+
+
+@pytest.mark.parametrize("text, font_size", [
+    ("EXIT", 300),  # sign
+    ("GO", 400),  # short word in huge type
+    ("Summer Sale", 150),  # poster title
+    ("Hello world text", 60),
+])
+def test_large_and_short_text_passes_prefilter(text, font_size):
+    assert _likely_has_text(_text_image(text, font_size))
+
+
+def test_plain_image_fails_prefilter():
+    assert not _likely_has_text(Image.new("RGB", (1200, 800), "skyblue"))
+
+
+def test_large_text_is_recognized_with_prefilter_on(fake_ocrmac):
+    ocr = OCR(skip_textless=True)
+    assert ocr.process(_text_image("EXIT", 300)) == "EXIT"
+    assert len(fake_ocrmac) == 1
+
+
+def test_prefilter_is_opt_in(fake_ocrmac):
+    assert OCR().process(Image.new("RGB", (1200, 800), "skyblue")) == "EXIT"
+    assert len(fake_ocrmac) == 1